@@ -1,10 +1,12 @@
 import asyncio
-import json
+import functools
 import time
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-import logging
+import httpx
+import tiktoken
 from openai import AsyncOpenAI
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, BaseMessage
@@ -12,28 +14,28 @@ from langchain_core.language_models.chat_models import BaseChatModel
 
 # Import PersonalityResearcher
 from personality_researcher import PersonalityResearcher
-from config import get_config
+from config import CacheConfig, get_config
+from logging_config import get_logger
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Get logger for this module
+logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DataQuality:
     has_sufficient_data: bool
     has_recent_data: bool
     total_pieces: int
 
 
-@dataclass
+@dataclass(slots=True)
 class InitializationResult:
     personality_context: str
     errors: List[str]
     data_quality: DataQuality
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConversationInfo:
     message_count: int
     estimated_tokens: int
@@ -41,7 +43,7 @@ class ConversationInfo:
     personality_context: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChatServiceConfig:
     person_name: str
     personality_context: Optional[str] = None
@@ -49,16 +51,20 @@ class ChatServiceConfig:
     model_name: str = "gpt-4"
     openai_api_key: Optional[str] = None
     enable_personality_research: bool = True
+    max_concurrency: int = 8  # Max in-flight model calls per service
+    requests_per_minute: int = 0  # OpenAI RPM budget shared per API key; 0 disables it
+    tokens_per_minute: int = 0  # OpenAI TPM budget shared per API key; 0 disables it
+    http_client: Optional[httpx.AsyncClient] = None  # Caller-owned pool shared with the model and researcher
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PersonalityCacheEntry:
     personality_context: str
-    timestamp: float
+    timestamp: float  # time.monotonic() when cached
     ttl: float  # Time to live in seconds
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatState:
     current_query: str
     response: str
@@ -69,73 +75,291 @@ class ChatState:
     messages: List[BaseMessage] = field(default_factory=list)
 
 
+class _RateLimiter:
+    """Token bucket that debits request and token capacity before each model call.
+
+    A limit of 0 leaves that dimension unlimited. Callers are served in arrival order.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_request_capacity = float(requests_per_minute)
+        self.available_token_capacity = float(tokens_per_minute)
+        self.last_update_time = time.monotonic()
+        # asyncio.Lock wakes waiters first-come first-served, so a large request is never starved by small ones
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the capacity earned since the last update, up to one minute's worth."""
+        now = time.monotonic()
+        elapsed = now - self.last_update_time
+        self.available_request_capacity = min(
+            float(self.requests_per_minute),
+            self.available_request_capacity + elapsed * self.requests_per_minute / 60
+        )
+        self.available_token_capacity = min(
+            float(self.tokens_per_minute),
+            self.available_token_capacity + elapsed * self.tokens_per_minute / 60
+        )
+        self.last_update_time = now
+
+    def _wait_time(self, est_tokens: int) -> float:
+        """Seconds until both buckets can cover one request of est_tokens."""
+        wait = 0.0
+        if self.requests_per_minute:
+            wait = max(wait, (1 - self.available_request_capacity) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            wait = max(wait, (est_tokens - self.available_token_capacity) * 60 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, est_tokens: int) -> None:
+        """Wait until both buckets can cover one request of est_tokens, then debit them."""
+        # A request larger than the whole bucket would never fit, so cap it
+        est_tokens = min(est_tokens, self.tokens_per_minute)
+        async with self._lock:
+            self._refill()
+            wait = self._wait_time(est_tokens)
+            while wait > 0:
+                await asyncio.sleep(wait)
+                self._refill()
+                wait = self._wait_time(est_tokens)
+            if self.requests_per_minute:
+                self.available_request_capacity -= 1
+            if self.tokens_per_minute:
+                self.available_token_capacity -= est_tokens
+
+
+# Basic personality used when research is disabled or finds nothing
+_FALLBACK_TEMPLATE = (
+    "You are {name}, an AI assistant with a friendly and helpful personality. "
+    "You have expertise in various topics and enjoy engaging in meaningful conversations. "
+    "You're known for being approachable, knowledgeable, and having a good sense of humor when appropriate."
+)
+
+
+# Personality contexts shared by every ChatService in the process, least recently used first
+# keyed by (person_name, enable_personality_research, model_name); only researched contexts are stored
+_personality_cache: "OrderedDict[Tuple[str, bool, str], PersonalityCacheEntry]" = OrderedDict()
+
+
+# Personality research currently running, keyed like _personality_cache; None means research found nothing
+_inflight_initializations: Dict[Tuple[str, bool, str], "asyncio.Future[Optional[str]]"] = {}
+
+
+def _get_cache_config() -> CacheConfig:
+    """Get the cache configuration, falling back to defaults if the backend config is unavailable."""
+    try:
+        return get_config().get_cache_config()
+    except ValueError:
+        return CacheConfig()
+
+
+@functools.lru_cache(maxsize=8)
+def _get_encoding(model_name: str) -> Optional[tiktoken.Encoding]:
+    """Get the tiktoken encoding for a model, or None if it cannot be loaded."""
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("[ChatService] Could not load tiktoken encoding for %s: %s", model_name, e)
+        return None
+
+
+async def warm_encoding(model_name: str) -> None:
+    """Load a model's tiktoken encoding in a worker thread, so later ChatServices find it cached.
+
+    The first load can download the BPE file, which would otherwise block the event loop
+    inside ChatService.__init__. A failed load leaves token estimates on the chars / 4 fallback.
+    """
+    await asyncio.to_thread(_get_encoding, model_name)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_rate_limiter(api_key: str, requests_per_minute: int, tokens_per_minute: int) -> Optional[_RateLimiter]:
+    """Get the rate limiter shared by every ChatService using the same API key, or None if both limits are off."""
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    return _RateLimiter(requests_per_minute, tokens_per_minute)
+
+
+# OpenAI clients shared per event loop, keyed by (api_key, model_name); a client's
+# connections belong to the loop that opened them, so they are never reused across loops
+_clients_by_loop: Dict[asyncio.AbstractEventLoop, Dict[Tuple[str, str], Tuple[AsyncOpenAI, ChatOpenAI]]] = {}
+
+
+def _build_clients(
+    api_key: str,
+    model_name: str,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> Tuple[AsyncOpenAI, ChatOpenAI]:
+    client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+    model = ChatOpenAI(
+        model_name=model_name,
+        openai_api_key=api_key,
+        temperature=0.7,
+        stream_usage=True,  # Report token usage, including prompt-cache hits, on streamed replies
+        http_async_client=http_client
+    )
+    return client, model
+
+
+def _get_clients(
+    api_key: str,
+    model_name: str,
+    http_client: Optional[httpx.AsyncClient] = None
+) -> Tuple[AsyncOpenAI, ChatOpenAI]:
+    """Get the OpenAI clients for a ChatService.
+
+    Services on the same event loop with the same key and model share one pair of clients.
+    Clients on a caller-owned http_client are built per service and never cached, since the
+    caller decides when that pool closes.
+    """
+    if http_client is not None:
+        return _build_clients(api_key, model_name, http_client)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop to share with yet
+        return _build_clients(api_key, model_name)
+
+    # Drop the clients of loops that have since closed
+    for closed_loop in [other for other in _clients_by_loop if other.is_closed()]:
+        del _clients_by_loop[closed_loop]
+
+    loop_clients = _clients_by_loop.setdefault(loop, {})
+    key = (api_key, model_name)
+    if key not in loop_clients:
+        loop_clients[key] = _build_clients(api_key, model_name)
+    return loop_clients[key]
+
+
 class ChatService:
     def __init__(self, config: ChatServiceConfig):
         self.person_name = config.person_name
         self.personality_context = config.personality_context or ""
-        self.thread_id = f"thread_{int(time.time() * 1000)}"
+        self.thread_id = f"thread_{time.monotonic_ns()}"
+        
+        # Set once a personality context is in place; the lock lets one caller auto-initialize
+        self._init_event = asyncio.Event()
+        self._init_lock = asyncio.Lock()
         self.is_initialized = bool(self.personality_context)
-        self.personality_cache: Dict[str, PersonalityCacheEntry] = {}
+        self.personality_cache = _personality_cache
         self.CACHE_TTL = 24 * 60 * 60  # 24 hours in seconds
         self.enable_personality_research = config.enable_personality_research
+        # Services only share cached or in-flight personalities when they would research them the same way
+        self._cache_key = (config.person_name, config.enable_personality_research, config.model_name)
+        self._http_client = config.http_client
+        
+        # Bound the number of concurrent model calls
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
         
         # Initialize OpenAI client
         if config.openai_api_key:
-            self.client = AsyncOpenAI(api_key=config.openai_api_key)
-            self.model = ChatOpenAI(
-                model_name=config.model_name,
-                openai_api_key=config.openai_api_key,
-                temperature=0.7
+            self._rate_limiter = _get_rate_limiter(
+                config.openai_api_key,
+                config.requests_per_minute,
+                config.tokens_per_minute
             )
+            # Shared per (event loop, key, model) so sessions reuse one connection pool
+            self.client, self.model = _get_clients(config.openai_api_key, config.model_name, config.http_client)
         else:
             raise ValueError("OpenAI API key is required")
         
-        # Initialize PersonalityResearcher if enabled
+        # PersonalityResearcher is built on first use, see _get_personality_researcher
         self.personality_researcher: Optional[PersonalityResearcher] = None
-        if self.enable_personality_research:
-            try:
-                backend_config = get_config()
-                personality_config = backend_config.get_personality_researcher_config()
-                self.personality_researcher = PersonalityResearcher(personality_config)
-                logger.info(f"[ChatService] Initialized PersonalityResearcher for {self.person_name}")
-            except Exception as e:
-                logger.warning(f"[ChatService] Failed to initialize PersonalityResearcher: {e}")
-                self.personality_researcher = None
+        self._personality_researcher_loaded = False
+        
+        # Conversation history, keeping the last 10 exchanges
+        self.conversation_history: Deque[BaseMessage] = deque(maxlen=20)
+        
+        # Tokenizer for token estimates (falls back to chars / 4 if unavailable)
+        self._encoding = _get_encoding(config.model_name)
+        
+        # Running conversation stats, kept in step with conversation_history
+        self._history_tokens: Deque[int] = deque(maxlen=20)  # Token count per history message
+        self._estimated_tokens: int = 0
+        self._message_count: int = 0
         
-        # Conversation history
-        self.conversation_history: List[BaseMessage] = []
+        # Token usage reported for the latest model call, e.g. input_token_details["cache_read"]
+        self.last_usage: Optional[Dict[str, Any]] = None
         
-        logger.info(f"[ChatService] Initialized for {self.person_name}")
+        logger.info("[ChatService] Initialized for %s", self.person_name)
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._init_event.is_set()
+
+    @is_initialized.setter
+    def is_initialized(self, is_initialized: bool) -> None:
+        if is_initialized:
+            self._init_event.set()
+        else:
+            self._init_event.clear()
+
+    @property
+    def personality_context(self) -> str:
+        return self._personality_context
+
+    @personality_context.setter
+    def personality_context(self, personality_context: str) -> None:
+        # Build the system message once per context instead of on every chat turn
+        self._personality_context = personality_context
+        self._system_message = SystemMessage(content=personality_context) if personality_context else None
+        self._system_tokens: Optional[int] = None
 
     def _get_cached_personality(self) -> Optional[PersonalityCacheEntry]:
         """Get cached personality if it exists and is not expired."""
-        cached = self.personality_cache.get(self.person_name)
+        cached = self.personality_cache.get(self._cache_key)
         if not cached:
             return None
         
-        now = time.time()
+        now = time.monotonic()
         if now - cached.timestamp > cached.ttl:
-            del self.personality_cache[self.person_name]
+            del self.personality_cache[self._cache_key]
             return None
         
+        self.personality_cache.move_to_end(self._cache_key)
         return cached
 
     def _cache_personality(self, personality_context: str) -> None:
-        """Cache personality context with timestamp."""
-        self.personality_cache[self.person_name] = PersonalityCacheEntry(
+        """Cache personality context with timestamp in the process-wide cache."""
+        self.personality_cache[self._cache_key] = PersonalityCacheEntry(
             personality_context=personality_context,
-            timestamp=time.time(),
+            timestamp=time.monotonic(),
             ttl=self.CACHE_TTL
         )
+        self.personality_cache.move_to_end(self._cache_key)
+        
+        # Evict least recently used entries beyond the configured size
+        max_cache_size = _get_cache_config().max_cache_size
+        while len(self.personality_cache) > max_cache_size:
+            self.personality_cache.popitem(last=False)
+
+    def _get_personality_researcher(self) -> Optional[PersonalityResearcher]:
+        """Get the PersonalityResearcher, creating it on first use."""
+        if not self._personality_researcher_loaded and self.enable_personality_research:
+            self._personality_researcher_loaded = True
+            try:
+                backend_config = get_config()
+                personality_config = backend_config.get_personality_researcher_config()
+                self.personality_researcher = PersonalityResearcher(personality_config, http_client=self._http_client)
+                logger.info("[ChatService] Initialized PersonalityResearcher for %s", self.person_name)
+            except Exception as e:
+                logger.warning("[ChatService] Failed to initialize PersonalityResearcher: %s", e)
+                self.personality_researcher = None
+        return self.personality_researcher
 
     async def _research_personality_directly(self) -> Optional[str]:
         """Research personality directly using PersonalityResearcher."""
-        if not self.personality_researcher:
-            logger.warning(f"[ChatService] PersonalityResearcher not available for {self.person_name}")
+        if not self._get_personality_researcher():
+            logger.warning("[ChatService] PersonalityResearcher not available for %s", self.person_name)
             return None
         
         try:
-            logger.info(f"[ChatService] Researching personality for {self.person_name}")
+            logger.info("[ChatService] Researching personality for %s", self.person_name)
             
             # Research the person
             personality_data = await self.personality_researcher.research_person(self.person_name)
@@ -143,16 +367,27 @@ class ChatService:
             # Generate system prompt
             system_prompt = self.personality_researcher.generate_system_prompt(self.person_name, personality_data)
             
-            logger.info(f"[ChatService] Successfully researched personality for {self.person_name}")
-            logger.info(f"[ChatService] Confidence score: {personality_data.confidence_score:.2f}")
-            logger.info(f"[ChatService] Quotes found: {len(personality_data.quotes)}")
+            logger.info("[ChatService] Successfully researched personality for %s", self.person_name)
+            logger.info("[ChatService] Confidence score: %.2f", personality_data.confidence_score)
+            logger.info("[ChatService] Quotes found: %s", len(personality_data.quotes))
             
             return system_prompt
             
         except Exception as e:
-            logger.error(f"[ChatService] Error researching personality for {self.person_name}: {e}")
+            logger.error("[ChatService] Error researching personality for %s: %s", self.person_name, e)
             return None
 
+    async def _build_personality_context(self) -> Optional[str]:
+        """Research a personality context for the person, or return None if research is off or finds nothing."""
+        if self.enable_personality_research and self._get_personality_researcher():
+            logger.info("[ChatService] Attempting personality research for %s", self.person_name)
+            researched_personality = await self._research_personality_directly()
+            
+            if researched_personality:
+                logger.info("[ChatService] Using researched personality for %s", self.person_name)
+                return researched_personality
+        return None
+
     async def initialize(self) -> InitializationResult:
         """Initialize the personality context for the person."""
         try:
@@ -161,7 +396,7 @@ class ChatService:
             if cached:
                 self.personality_context = cached.personality_context
                 self.is_initialized = True
-                logger.info(f"[ChatService] Using cached personality for {self.person_name}")
+                logger.info("[ChatService] Using cached personality for %s", self.person_name)
                 return InitializationResult(
                     personality_context=cached.personality_context,
                     errors=[],
@@ -172,37 +407,33 @@ class ChatService:
                     )
                 )
 
-            logger.info(f"[ChatService] Starting initialization for {self.person_name}")
+            logger.info("[ChatService] Starting initialization for %s", self.person_name)
+            
+            # Join in-flight research for the same cache key instead of researching twice
+            cache_key = self._cache_key
+            task = _inflight_initializations.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(self._build_personality_context())
+                _inflight_initializations[cache_key] = task
+                task.add_done_callback(lambda _: _inflight_initializations.pop(cache_key, None))
+            else:
+                logger.info("[ChatService] Joining in-flight initialization for %s", self.person_name)
             
-            # Try to research personality if enabled
-            if self.enable_personality_research and self.personality_researcher:
-                logger.info(f"[ChatService] Attempting personality research for {self.person_name}")
-                researched_personality = await self._research_personality_directly()
-                
-                if researched_personality:
-                    personality_context = researched_personality
-                    logger.info(f"[ChatService] Using researched personality for {self.person_name}")
-                else:
-                    # Fallback to basic personality context
-                    personality_context = f"""You are {self.person_name}, an AI assistant with a friendly and helpful personality. 
-                    You have expertise in various topics and enjoy engaging in meaningful conversations. 
-                    You're known for being approachable, knowledgeable, and having a good sense of humor when appropriate."""
-                    logger.info(f"[ChatService] Using fallback personality for {self.person_name}")
+            # Shield so a cancelled caller does not cancel the work other callers await
+            personality_context = await asyncio.shield(task)
+            
+            if personality_context:
+                # Only researched contexts are cached; a fallback must not mask later research
+                self._cache_personality(personality_context)
             else:
-                # Use basic personality context
-                personality_context = f"""You are {self.person_name}, an AI assistant with a friendly and helpful personality. 
-                You have expertise in various topics and enjoy engaging in meaningful conversations. 
-                You're known for being approachable, knowledgeable, and having a good sense of humor when appropriate."""
-                logger.info(f"[ChatService] Using basic personality for {self.person_name}")
+                personality_context = _FALLBACK_TEMPLATE.format(name=self.person_name)
+                logger.info("[ChatService] Using basic personality for %s", self.person_name)
             
             # Update service state
             self.personality_context = personality_context
             self.is_initialized = True
             
-            # Cache the result
-            self._cache_personality(personality_context)
-            
-            logger.info(f"[ChatService] Initialization completed for {self.person_name}")
+            logger.info("[ChatService] Initialization completed for %s", self.person_name)
             
             return InitializationResult(
                 personality_context=personality_context,
@@ -215,7 +446,7 @@ class ChatService:
             )
             
         except Exception as err:
-            logger.error(f"[ChatService] Error in initialization: {err}")
+            logger.error("[ChatService] Error in initialization: %s", err)
             # Set a basic personality context as fallback
             self.personality_context = f"You are {self.person_name}. I'll respond in a helpful and engaging manner."
             self.is_initialized = True
@@ -230,80 +461,152 @@ class ChatService:
                 )
             )
 
+    async def _ensure_initialized(self) -> None:
+        """Initialize on first use, letting concurrent callers share one initialization."""
+        if self._init_event.is_set():
+            return
+        async with self._init_lock:
+            if not self._init_event.is_set():
+                logger.info("[ChatService] Auto-initializing for %s", self.person_name)
+                await self.initialize()
+
+    def _count_tokens(self, text: str) -> int:
+        """Count the tokens in a piece of text."""
+        if self._encoding is None:
+            return len(text) // 4
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def _system_prompt_tokens(self) -> int:
+        """Token count of the personality context, computed once per context."""
+        if self._system_tokens is None:
+            self._system_tokens = self._count_tokens(self.personality_context)
+        return self._system_tokens
+
+    def _build_messages(self, message: str, history: List[BaseMessage]) -> List[BaseMessage]:
+        """Build the full message list for a model call; the last item is the new user message."""
+        prefix = [self._system_message] if self._system_message else []
+        return [*prefix, *history, HumanMessage(content=message)]
+
+    async def _invoke(self, messages: List[BaseMessage], est_tokens: int) -> str:
+        """Call the model, bounded by the rate limiter and the service concurrency limit."""
+        # Throttle up front instead of relying on retries after a 429
+        if self._rate_limiter:
+            await self._rate_limiter.acquire(est_tokens)
+        async with self._semaphore:
+            response = await self.model.ainvoke(messages)
+        self.last_usage = response.usage_metadata
+        return response.content
+
+    async def _stream(self, messages: List[BaseMessage], est_tokens: int) -> AsyncIterator[str]:
+        """Stream model output, holding a concurrency slot until the stream ends."""
+        if self._rate_limiter:
+            await self._rate_limiter.acquire(est_tokens)
+        async with self._semaphore:
+            async for chunk in self.model.astream(messages):
+                if chunk.usage_metadata:
+                    self.last_usage = chunk.usage_metadata
+                if chunk.content:
+                    yield chunk.content
+
+    async def achat_stream(self, message: str) -> AsyncIterator[str]:
+        """Send a message and yield the response as it is generated.
+
+        The full response is added to the conversation history once the stream
+        completes.
+        """
+        # Ensure initialization is complete
+        await self._ensure_initialized()
+
+        # Build messages for the chat and stream the response from the model
+        messages = self._build_messages(message, self.conversation_history)
+        message_tokens = self._count_tokens(message)
+        est_tokens = self._system_prompt_tokens() + self._estimated_tokens + message_tokens
+        
+        chunks = []
+        async for chunk in self._stream(messages, est_tokens):
+            chunks.append(chunk)
+            yield chunk
+        response_content = "".join(chunks)
+        
+        # Update conversation history, discounting whatever the deque evicts
+        response_tokens = self._count_tokens(response_content)
+        for history_message, tokens in (
+            (messages[-1], message_tokens),  # Reuse the HumanMessage that was sent
+            (AIMessage(content=response_content), response_tokens)
+        ):
+            if len(self._history_tokens) == self._history_tokens.maxlen:
+                self._estimated_tokens -= self._history_tokens[0]
+            self.conversation_history.append(history_message)
+            self._history_tokens.append(tokens)
+            self._estimated_tokens += tokens
+        
+        self._message_count = len(self.conversation_history) // 2
+        
+        logger.info("[ChatService] Response generated for %s", self.person_name)
+
     async def chat(self, message: str) -> str:
         """Send a message and get a response."""
+        try:
+            chunks = [chunk async for chunk in self.achat_stream(message)]
+            return "".join(chunks)
+            
+        except Exception as e:
+            logger.error("[ChatService] Error in chat: %s", e)
+            raise Exception(f"Failed to generate response: {e}")
+
+    async def achat_many(self, messages: List[str]) -> List[str]:
+        """Send several independent messages concurrently and get their responses.
+
+        Every message is answered against the personality context and a snapshot
+        of the current conversation history. Responses are returned in input order
+        and are not added to the conversation history.
+        """
         try:
             # Ensure initialization is complete
-            if not self.is_initialized:
-                logger.info(f"[ChatService] Auto-initializing for {self.person_name}")
-                await self.initialize()
+            await self._ensure_initialized()
 
-            # Build messages for the chat
-            messages = []
-            
-            # Add system message with personality context
-            if self.personality_context:
-                messages.append(SystemMessage(content=self.personality_context))
+            history = list(self.conversation_history)
+            base_tokens = self._system_prompt_tokens() + self._estimated_tokens
+            responses = await asyncio.gather(*[
+                self._invoke(self._build_messages(message, history), base_tokens + self._count_tokens(message))
+                for message in messages
+            ])
             
-            # Add conversation history
-            messages.extend(self.conversation_history)
-            
-            # Add current user message
-            messages.append(HumanMessage(content=message))
-            
-            # Get response from model
-            response = await self.model.ainvoke(messages)
-            response_content = response.content
-            
-            # Update conversation history
-            self.conversation_history.append(HumanMessage(content=message))
-            self.conversation_history.append(AIMessage(content=response_content))
-            
-            # Keep conversation history manageable
-            if len(self.conversation_history) > 20:  # Keep last 10 exchanges
-                self.conversation_history = self.conversation_history[-20:]
-            
-            logger.info(f"[ChatService] Response generated for {self.person_name}")
-            return response_content
+            logger.info("[ChatService] Generated %s responses for %s", len(responses), self.person_name)
+            return list(responses)
             
         except Exception as e:
-            logger.error(f"[ChatService] Error in chat: {e}")
-            raise Exception(f"Failed to generate response: {e}")
+            logger.error("[ChatService] Error in achat_many: %s", e)
+            raise Exception(f"Failed to generate responses: {e}")
 
-    async def clear_conversation(self) -> None:
+    def clear_conversation(self) -> None:
         """Clear the conversation history."""
         try:
             # Create a new thread ID to effectively clear the conversation
-            self.thread_id = f"thread_{int(time.time() * 1000)}"
+            self.thread_id = f"thread_{time.monotonic_ns()}"
             self.conversation_history.clear()
-            logger.info(f"[ChatService] Conversation cleared. New thread ID: {self.thread_id}")
+            self._history_tokens.clear()
+            self._estimated_tokens = 0
+            self._message_count = 0
+            logger.info("[ChatService] Conversation cleared. New thread ID: %s", self.thread_id)
         except Exception as err:
-            logger.error(f"[ChatService] Error clearing conversation: {err}")
+            logger.error("[ChatService] Error clearing conversation: %s", err)
             raise Exception("Failed to clear conversation.")
 
-    async def get_conversation_info(self) -> ConversationInfo:
+    def get_conversation_info(self) -> ConversationInfo:
         """Get information about the current conversation."""
-        try:
-            message_count = len(self.conversation_history) // 2  # Each exchange has 2 messages
-            
-            # Estimate tokens based on conversation history
-            estimated_tokens = len(json.dumps([msg.dict() for msg in self.conversation_history])) // 4
-            
-            return ConversationInfo(
-                message_count=message_count,
-                estimated_tokens=estimated_tokens,
-                person_name=self.person_name,
-                personality_context=self.personality_context
-            )
-        except Exception as err:
-            logger.error(f"[ChatService] Error getting conversation info: {err}")
-            # Return default values if there's an error
-            return ConversationInfo(
-                message_count=0,
-                estimated_tokens=0,
-                person_name=self.person_name,
-                personality_context=self.personality_context
-            )
+        # Counters are maintained incrementally by chat() and clear_conversation()
+        return ConversationInfo(
+            message_count=self._message_count,
+            estimated_tokens=self._estimated_tokens,
+            person_name=self.person_name,
+            personality_context=self.personality_context
+        )
+
+    async def aclose(self) -> None:
+        """Release connections held by this service's PersonalityResearcher."""
+        if self.personality_researcher:
+            await self.personality_researcher.aclose()
 
     # Getter methods for external access
     def get_person_name(self) -> str:
@@ -318,6 +621,5 @@ class ChatService:
     async def reinitialize(self) -> InitializationResult:
         """Force re-initialization of personality."""
         self.is_initialized = False
-        if self.person_name in self.personality_cache:
-            del self.personality_cache[self.person_name]
+        self.personality_cache.pop(self._cache_key, None)
         return await self.initialize() 
\ No newline at end of file
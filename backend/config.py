@@ -4,6 +4,7 @@ Backend Service Configuration
 Centralized configuration management for all backend services
 """
 
+import functools
 import os
 from typing import Optional
 from dataclasses import dataclass, field
@@ -13,7 +14,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PersonalityResearcherConfig:
     """Configuration for PersonalityResearcher."""
     tavily_api_key: str
@@ -25,9 +26,11 @@ class PersonalityResearcherConfig:
     cache_ttl: int = 24 * 60 * 60  # 24 hours in seconds
     min_score_threshold: float = 0.5
     include_images: bool = False
+    llm_concurrency: int = 8  # Max concurrent quote-extraction LLM calls
+    keep_raw: bool = False  # Keep raw search results and page content on PersonalityData.debug
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChatServiceConfig:
     """Configuration for ChatService."""
     openai_api_key: str
@@ -36,9 +39,11 @@ class ChatServiceConfig:
     temperature: float = 0.7
     max_conversation_history: int = 50
     enable_personality_research: bool = True
+    requests_per_minute: int = 0  # OpenAI rate limit to throttle to; 0 disables it
+    tokens_per_minute: int = 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CacheConfig:
     """Configuration for caching."""
     enable_cache: bool = True
@@ -47,7 +52,7 @@ class CacheConfig:
     cache_type: str = "memory"  # memory, redis, etc.
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BackendConfig:
     """Main configuration class for the entire backend service."""
     
@@ -83,7 +88,9 @@ class BackendConfig:
             extract_depth=os.getenv("TAVILY_EXTRACT_DEPTH", "advanced"),
             cache_ttl=int(os.getenv("TAVILY_CACHE_TTL", str(24 * 60 * 60))),
             min_score_threshold=float(os.getenv("TAVILY_MIN_SCORE", "0.5")),
-            include_images=os.getenv("TAVILY_INCLUDE_IMAGES", "false").lower() == "true"
+            include_images=os.getenv("TAVILY_INCLUDE_IMAGES", "false").lower() == "true",
+            llm_concurrency=int(os.getenv("RESEARCH_LLM_CONCURRENCY", "8")),
+            keep_raw=os.getenv("RESEARCH_KEEP_RAW", "false").lower() == "true"
         )
         
         # Chat Service Config
@@ -93,7 +100,9 @@ class BackendConfig:
             max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "0")) or None,
             temperature=float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
             max_conversation_history=int(os.getenv("CHAT_MAX_HISTORY", "50")),
-            enable_personality_research=os.getenv("ENABLE_PERSONALITY_RESEARCH", "true").lower() == "true"
+            enable_personality_research=os.getenv("ENABLE_PERSONALITY_RESEARCH", "true").lower() == "true",
+            requests_per_minute=int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "0")),
+            tokens_per_minute=int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
         )
         
         # Cache Config
@@ -140,6 +149,12 @@ class BackendConfig:
         if self.personality_researcher.max_extract_results <= 0:
             errors.append("max_extract_results must be positive")
         
+        if self.chat_service.requests_per_minute < 0 or self.chat_service.tokens_per_minute < 0:
+            errors.append("OpenAI rate limits must not be negative")
+        
+        if self.personality_researcher.llm_concurrency <= 0:
+            errors.append("llm_concurrency must be positive")
+        
         if errors:
             raise ValueError(f"Configuration validation failed: {'; '.join(errors)}")
     
@@ -168,27 +183,34 @@ class BackendConfig:
         return self.environment == "testing"
 
 
-# Global configuration instance
+# Configuration installed with set_config, used instead of the environment
 _config: Optional[BackendConfig] = None
 
 
+@functools.lru_cache(maxsize=1)
+def _config_from_environment() -> BackendConfig:
+    """Parse and validate the configuration from the environment, once."""
+    config = BackendConfig.from_environment()
+    config.validate()
+    return config
+
+
 def get_config() -> BackendConfig:
     """Get the global configuration instance."""
-    global _config
-    if _config is None:
-        _config = BackendConfig.from_environment()
-        _config.validate()
-    return _config
+    if _config is not None:
+        return _config
+    return _config_from_environment()
 
 
 def set_config(config: BackendConfig) -> None:
     """Set the global configuration instance."""
     global _config
+    config.validate()
     _config = config
-    _config.validate()
 
 
 def reset_config() -> None:
-    """Reset the global configuration instance."""
+    """Reset the global configuration instance so it is re-read from the environment on next use."""
     global _config
-    _config = None 
\ No newline at end of file
+    _config = None
+    _config_from_environment.cache_clear()
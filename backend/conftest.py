@@ -7,11 +7,12 @@ import pytest
 from pathlib import Path
 from dotenv import load_dotenv
 
+import event_loops
+
 # Load environment variables from .env file in project root
 project_root = Path(__file__).parent.parent
 load_dotenv(project_root / ".env")
 
-
 def pytest_configure(config):
     """Configure pytest with environment setup and custom markers."""
     # Register custom markers
@@ -44,6 +45,12 @@ def pytest_collection_modifyitems(config, items):
                 item.add_marker(pytest.mark.skip(reason="Requires OPENAI_API_KEY"))
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop when it is installed (pytest-asyncio builds each test's loop from this factory)."""
+    return {"default": event_loops.loop_factory()}
+
+
 @pytest.fixture(scope="session")
 def openai_api_key():
     """Provide OpenAI API key for tests that need it."""
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Event Loops - Optional uvloop support for the tests and test scripts
+uvloop is used when it is installed; it has no Windows support, so the default asyncio loop is used there
+"""
+
+import asyncio
+import sys
+from types import ModuleType
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _import_uvloop() -> Optional[ModuleType]:
+    """Import uvloop, or return None if it is unavailable on this platform or not installed."""
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop
+
+
+def loop_factory() -> Callable[[], asyncio.AbstractEventLoop]:
+    """Get uvloop's event loop factory when available, otherwise asyncio's."""
+    uvloop = _import_uvloop()
+    return uvloop.new_event_loop if uvloop else asyncio.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine like asyncio.run, on a uvloop event loop when available."""
+    with asyncio.Runner(loop_factory=loop_factory()) as runner:
+        return runner.run(main)
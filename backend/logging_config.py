@@ -4,8 +4,12 @@ Centralized Logging Configuration
 Provides consistent logging setup across all backend services
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from typing import Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
@@ -76,5 +80,32 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+# Background writer for report loggers, started on first use
+_report_listener: Optional[logging.handlers.QueueListener] = None
+_report_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+
+
+def get_report_logger(name: str) -> logging.Logger:
+    """Get a logger that writes bare messages to stdout from a background thread.
+
+    Callers only enqueue records, so writing a long report never blocks the event loop.
+    Queued records are flushed when the process exits.
+    """
+    global _report_listener
+    if _report_listener is None:
+        stdout_handler = logging.StreamHandler(sys.stdout)
+        stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+        _report_listener = logging.handlers.QueueListener(_report_queue, stdout_handler)
+        _report_listener.start()
+        atexit.register(_report_listener.stop)
+    
+    logger = logging.getLogger(name)
+    if not any(isinstance(handler, logging.handlers.QueueHandler) for handler in logger.handlers):
+        logger.addHandler(logging.handlers.QueueHandler(_report_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False  # Reports go to stdout only, not through the root handlers
+    return logger
+
+
 # Setup logging on module import
 setup_logging() 
\ No newline at end of file
@@ -6,27 +6,48 @@ Provides REST API endpoints for frontend integration
 
 import os
 import asyncio
-from typing import Dict, Optional
-from fastapi import FastAPI, HTTPException, Depends
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple
+from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import logging
 
-from chat_service import ChatService, ChatServiceConfig, InitializationResult, ConversationInfo
+from chat_service import ChatService, ChatServiceConfig, InitializationResult, ConversationInfo, warm_encoding
+from logging_config import get_logger
+from personality_researcher import aclose_shared_http_client, warm_encoding as warm_research_encoding
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Get logger for this module
+logger = get_logger(__name__)
+
+# Model used by every chat service the API creates
+CHAT_MODEL = "gpt-4"
+
+# OpenAI account limits to throttle chat calls to; 0 (the default) leaves that limit off
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "0"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the tokenizers before serving, and release chat service connections on shutdown."""
+    await asyncio.gather(warm_encoding(CHAT_MODEL), warm_research_encoding())
+    yield
+    await chat_services.aclose()
+    await aclose_shared_http_client()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Chat Service API",
     description="REST API for AI chat service with personality initialization",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware for frontend integration
@@ -38,8 +59,104 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class ChatServiceCache:
+    """Bounded LRU store of chat services that also drops services idle for longer than the TTL."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._services: "OrderedDict[str, Tuple[ChatService, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Requests currently using each service, and evicted services waiting for theirs to finish
+        self._leases: Dict[ChatService, int] = {}
+        self._retired: Set[ChatService] = set()
+        # Close tasks are kept referenced until done, so they are not garbage-collected mid-close
+        self._close_tasks: Set["asyncio.Task[None]"] = set()
+
+    def get(self, person_name: str) -> Optional[ChatService]:
+        """Return the service for a person, refreshing its recency, or None if missing or expired."""
+        entry = self._services.get(person_name)
+        if entry is not None:
+            service, last_used = entry
+            now = time.monotonic()
+            if now - last_used <= self.ttl:
+                self._services[person_name] = (service, now)
+                self._services.move_to_end(person_name)
+                self.hits += 1
+                return service
+            self._evict(person_name)
+        self.misses += 1
+        return None
+
+    def set(self, person_name: str, service: ChatService) -> None:
+        """Store a service, evicting the least recently used one when full."""
+        self._services[person_name] = (service, time.monotonic())
+        self._services.move_to_end(person_name)
+        while len(self._services) > self.maxsize:
+            self._evict(next(iter(self._services)))
+
+    def _evict(self, person_name: str) -> None:
+        service, _ = self._services.pop(person_name)
+        self.evictions += 1
+        # Requests still using the service keep it open; the last one to finish closes it
+        if self._leases.get(service):
+            self._retired.add(service)
+        else:
+            self._close_later(service)
+
+    def _close_later(self, service: ChatService) -> None:
+        """Release a service's connections in the background without blocking the caller."""
+        task = asyncio.ensure_future(service.aclose())
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_done)
+
+    def _close_done(self, task: "asyncio.Task[None]") -> None:
+        self._close_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Error closing evicted chat service: %s", task.exception())
+
+    @contextmanager
+    def lease(self, service: ChatService) -> Iterator[ChatService]:
+        """Keep a service open for the duration of a request, even if it is evicted meanwhile."""
+        self._leases[service] = self._leases.get(service, 0) + 1
+        try:
+            yield service
+        finally:
+            self._leases[service] -= 1
+            if not self._leases[service]:
+                del self._leases[service]
+                if service in self._retired:
+                    self._retired.discard(service)
+                    self._close_later(service)
+
+    async def aclose(self) -> None:
+        """Close every stored service and wait for pending background closes."""
+        for service in self.values():
+            await service.aclose()
+        if self._close_tasks:
+            await asyncio.gather(*self._close_tasks, return_exceptions=True)
+
+    def values(self):
+        return [service for service, _ in self._services.values()]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._services),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+# Test-only endpoints are served only when the server is started with ENABLE_TEST_ENDPOINTS=1
+ENABLE_TEST_ENDPOINTS = os.getenv("ENABLE_TEST_ENDPOINTS") == "1"
+
 # Global storage for chat service instances
-chat_services: Dict[str, ChatService] = {}
+chat_services = ChatServiceCache(
+    maxsize=int(os.getenv("CHAT_SERVICE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("CHAT_SERVICE_CACHE_TTL", "3600"))
+)
 
 # Pydantic models for API requests/responses
 class ChatRequest(BaseModel):
@@ -79,18 +196,28 @@ def get_openai_api_key() -> str:
 
 def get_or_create_chat_service(person_name: str) -> ChatService:
     """Get existing chat service or create a new one for the person."""
-    if person_name not in chat_services:
+    chat_service = chat_services.get(person_name)
+    if chat_service is None:
         api_key = get_openai_api_key()
         config = ChatServiceConfig(
             person_name=person_name,
             openai_api_key=api_key,
-            model_name="gpt-4",
-            enable_personality_research=True
+            model_name=CHAT_MODEL,
+            enable_personality_research=True,
+            requests_per_minute=OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=OPENAI_TOKENS_PER_MINUTE
         )
-        chat_services[person_name] = ChatService(config)
-        logger.info(f"Created new chat service for {person_name}")
+        chat_service = ChatService(config)
+        chat_services.set(person_name, chat_service)
+        logger.info("Created new chat service for %s", person_name)
     
-    return chat_services[person_name]
+    return chat_service
+
+@contextmanager
+def use_chat_service(person_name: str) -> Iterator[ChatService]:
+    """Get or create the service for a person and keep it open until the request is done with it."""
+    with chat_services.lease(get_or_create_chat_service(person_name)) as chat_service:
+        yield chat_service
 
 @app.get("/")
 async def root():
@@ -111,8 +238,8 @@ async def root():
 async def initialize_personality(request: InitializeRequest):
     """Initialize the AI personality for a given person."""
     try:
-        chat_service = get_or_create_chat_service(request.person_name)
-        result: InitializationResult = await chat_service.initialize()
+        with use_chat_service(request.person_name) as chat_service:
+            result: InitializationResult = await chat_service.initialize()
         
         return InitializeResponse(
             success=len(result.errors) == 0,
@@ -125,20 +252,19 @@ async def initialize_personality(request: InitializeRequest):
             }
         )
     except Exception as e:
-        logger.error(f"Error initializing personality for {request.person_name}: {e}")
+        logger.error("Error initializing personality for %s: %s", request.person_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Send a message and get an AI response."""
     try:
-        chat_service = get_or_create_chat_service(request.person_name)
-        
-        # Send message and get response
-        response = await chat_service.chat(request.message)
-        
-        # Get conversation info
-        info: ConversationInfo = await chat_service.get_conversation_info()
+        with use_chat_service(request.person_name) as chat_service:
+            # Send message and get response
+            response = await chat_service.chat(request.message)
+            
+            # Get conversation info
+            info: ConversationInfo = chat_service.get_conversation_info()
         
         return ChatResponse(
             response=response,
@@ -147,7 +273,7 @@ async def chat(request: ChatRequest):
             estimated_tokens=info.estimated_tokens
         )
     except Exception as e:
-        logger.error(f"Error in chat for {request.person_name}: {e}")
+        logger.error("Error in chat for %s: %s", request.person_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/conversation/{person_name}", response_model=ConversationInfoResponse)
@@ -155,7 +281,7 @@ async def get_conversation_info(person_name: str):
     """Get information about the current conversation."""
     try:
         chat_service = get_or_create_chat_service(person_name)
-        info: ConversationInfo = await chat_service.get_conversation_info()
+        info: ConversationInfo = chat_service.get_conversation_info()
         
         return ConversationInfoResponse(
             message_count=info.message_count,
@@ -164,7 +290,7 @@ async def get_conversation_info(person_name: str):
             personality_context=info.personality_context
         )
     except Exception as e:
-        logger.error(f"Error getting conversation info for {person_name}: {e}")
+        logger.error("Error getting conversation info for %s: %s", person_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/conversation/{person_name}")
@@ -172,19 +298,37 @@ async def clear_conversation(person_name: str):
     """Clear the conversation history for a person."""
     try:
         chat_service = get_or_create_chat_service(person_name)
-        await chat_service.clear_conversation()
+        chat_service.clear_conversation()
         
         return {"message": f"Conversation cleared for {person_name}"}
     except Exception as e:
-        logger.error(f"Error clearing conversation for {person_name}: {e}")
+        logger.error("Error clearing conversation for %s: %s", person_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/conversation/{person_name}/debug", include_in_schema=False)
+async def get_conversation_debug(person_name: str, x_test_mode: Optional[str] = Header(None)):
+    """Return the raw conversation state, so tests can check it without another LLM call.
+
+    Requires ENABLE_TEST_ENDPOINTS=1 on the server and an `X-Test-Mode: 1` request header.
+    """
+    if not ENABLE_TEST_ENDPOINTS or x_test_mode != "1":
+        raise HTTPException(status_code=404, detail="Not Found")
+    chat_service = get_or_create_chat_service(person_name)
+    return {
+        "person_name": chat_service.person_name,
+        "thread_id": chat_service.thread_id,
+        "messages": [
+            {"type": message.type, "content": message.content}
+            for message in chat_service.conversation_history
+        ]
+    }
+
 @app.post("/reinitialize/{person_name}", response_model=InitializeResponse)
 async def reinitialize_personality(person_name: str):
     """Force re-initialization of the AI personality."""
     try:
-        chat_service = get_or_create_chat_service(person_name)
-        result: InitializationResult = await chat_service.reinitialize()
+        with use_chat_service(person_name) as chat_service:
+            result: InitializationResult = await chat_service.reinitialize()
         
         return InitializeResponse(
             success=len(result.errors) == 0,
@@ -197,14 +341,25 @@ async def reinitialize_personality(person_name: str):
             }
         )
     except Exception as e:
-        logger.error(f"Error reinitializing personality for {person_name}: {e}")
+        logger.error("Error reinitializing personality for %s: %s", person_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": asyncio.get_event_loop().time()}
+    return {
+        "status": "healthy",
+        "timestamp": time.monotonic(),
+        "chat_services": chat_services.stats()
+    }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # uvicorn picks uvloop and httptools automatically when installed (pip install "uvicorn[standard]").
+    # Chat services live in process memory, so more than one worker needs sticky routing on person_name.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("UVICORN_WORKERS", "1"))
+    ) 
\ No newline at end of file
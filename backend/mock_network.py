@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Mock Network - Fixture-backed OpenAI and Tavily responses for the test scripts
+Test runs are offline by default; set LIVE=1 to call the real APIs
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+import orjson
+
+# Live API calls are opt-in
+LIVE = os.environ.get("LIVE") == "1"
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _load_fixture(name: str) -> Dict[str, Any]:
+    return orjson.loads((FIXTURES_DIR / name).read_bytes())
+
+
+def use_fixture_keys() -> None:
+    """Provide placeholder API keys so configuration validates without real credentials."""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-fixture")
+    os.environ.setdefault("TAVILY_API_KEY", "tvly-fixture")
+
+
+def _chat_completion(body: Dict[str, Any]) -> httpx.Response:
+    """Answer a chat completion request, streamed or not, from the fixtures."""
+    if body.get("response_format", {}).get("type") == "json_object":
+        # Quote extraction asks for a bare JSON object
+        content = orjson.dumps(_load_fixture("openai_quote_extraction.json")).decode()
+        usage = {"prompt_tokens": 800, "completion_tokens": 120, "total_tokens": 920}
+    else:
+        reply = _load_fixture("openai_chat_reply.json")
+        content, usage = reply["content"], reply["usage"]
+
+    base = {"id": "chatcmpl-fixture", "created": 0, "model": body.get("model", "gpt-4o-mini")}
+    if not body.get("stream"):
+        return httpx.Response(200, json={
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        })
+
+    # Stream one word per chunk, then the usage chunk that stream_options.include_usage asks for
+    words = content.split(" ")
+    chunks = [
+        {
+            **base,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": word if i == 0 else " " + word}, "finish_reason": None}]
+        }
+        for i, word in enumerate(words)
+    ]
+    chunks.append({**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+    chunks.append({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+    events = b"".join(b"data: " + orjson.dumps(chunk) + b"\n\n" for chunk in chunks) + b"data: [DONE]\n\n"
+    return httpx.Response(200, content=events, headers={"content-type": "text/event-stream"})
+
+
+def _handle_request(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "api.openai.com" and request.url.path.endswith("/chat/completions"):
+        return _chat_completion(orjson.loads(request.content))
+    return httpx.Response(404, json={"error": {"message": f"No fixture for {request.method} {request.url}"}})
+
+
+def make_http_client(**kwargs) -> httpx.AsyncClient:
+    """Build the shared HTTP client: a real one when LIVE=1, otherwise one answered from fixtures."""
+    if LIVE:
+        return httpx.AsyncClient(**kwargs)
+    kwargs.pop("limits", None)
+    return httpx.AsyncClient(transport=httpx.MockTransport(_handle_request), **kwargs)
+
+
+class FixtureTavilyTool:
+    """Stand-in for TavilySearch and TavilyExtract that answers from the fixtures."""
+
+    async def ainvoke(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if "urls" in payload:
+            raw_content = _load_fixture("tavily_extract.json")["raw_content"]
+            return {"results": [{"url": url, "raw_content": raw_content} for url in payload["urls"]], "failed_results": []}
+        return {**_load_fixture("tavily_search.json"), "query": payload["query"]}
+
+
+def install_tavily_fixtures(researcher) -> None:
+    """Point a PersonalityResearcher's Tavily tools at the fixtures."""
+    researcher.tavily_search = FixtureTavilyTool()
+    researcher.tavily_extract = FixtureTavilyTool()
@@ -5,18 +5,109 @@ Extracts personality information from web search results to generate AI system p
 """
 
 import asyncio
+import functools
+import hashlib
+import heapq
+import re
 import time
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+import httpx
+import orjson
+import tiktoken
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from langchain_tavily import TavilySearch, TavilyExtract
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from config import PersonalityResearcherConfig
 from logging_config import get_logger
 
 # Get logger for this module
 logger = get_logger(__name__)
 
+# Model used for quote extraction
+QUOTE_EXTRACTION_MODEL = "gpt-4o-mini"  # Fast and cost-effective
 
-@dataclass
+# Bump whenever the quote extraction prompt changes so cached LLM results are not reused
+PROMPT_VERSION = "2"
+
+# Keywords marking a search result as describing personality traits
+_TRAIT_PATTERN = re.compile(r"philosophy|thinking|style|personality|approach", re.IGNORECASE)
+
+# Token limits for quote extraction: page content sent in, and JSON response out
+MAX_CONTENT_TOKENS = 3000
+MAX_RESPONSE_TOKENS = 1000
+
+# Upper bound on cached quote extraction results per researcher
+MAX_LLM_CACHE_SIZE = 4096
+
+# Upper bound on cached extracted pages per researcher; each holds at most MAX_CONTENT_TOKENS of text
+MAX_URL_CACHE_SIZE = 256
+
+
+# Connection pool for quote extraction shared by every researcher on an event loop,
+# so the number of sockets does not grow with the number of researchers
+_shared_http_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def _get_shared_http_client() -> httpx.AsyncClient:
+    """Get the quote extraction pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    # Drop the pools of loops that have since closed
+    for closed_loop in [other for other in _shared_http_clients if other.is_closed()]:
+        del _shared_http_clients[closed_loop]
+    if loop not in _shared_http_clients:
+        # Sized for the concurrent quote extraction fan-out (transport retries cover connection failures only)
+        _shared_http_clients[loop] = DefaultAsyncHttpxClient(
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60.0)
+            )
+        )
+    return _shared_http_clients[loop]
+
+
+async def aclose_shared_http_client() -> None:
+    """Close the running event loop's shared quote extraction pool, if one was created."""
+    http_client = _shared_http_clients.pop(asyncio.get_running_loop(), None)
+    if http_client is not None:
+        await http_client.aclose()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    """Get the tiktoken encoding for the quote extraction model, or None if it cannot be loaded."""
+    try:
+        return tiktoken.encoding_for_model(QUOTE_EXTRACTION_MODEL)
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding for %s: %s", QUOTE_EXTRACTION_MODEL, e)
+        return None
+
+
+async def warm_encoding() -> None:
+    """Load the quote extraction encoding in a worker thread, so truncation never loads it on the event loop."""
+    await asyncio.to_thread(_get_encoding)
+
+
+def _truncate_content(content: str) -> str:
+    """Truncate page content to MAX_CONTENT_TOKENS, falling back to ~4 chars per token."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return content[:MAX_CONTENT_TOKENS * 4]
+    # Pre-slice generously so huge pages are not tokenized in full
+    tokens = encoding.encode(content[:MAX_CONTENT_TOKENS * 10], disallowed_special=())
+    if len(tokens) <= MAX_CONTENT_TOKENS:
+        return content[:MAX_CONTENT_TOKENS * 10]
+    return encoding.decode(tokens[:MAX_CONTENT_TOKENS])
+
+
+@dataclass(slots=True)
+class PersonalityDebug:
+    """Raw research inputs, kept only when the researcher is configured with keep_raw."""
+    search_results: List[Dict] = field(default_factory=list)
+    extracted_content: List[str] = field(default_factory=list)  # Page text as sent for quote extraction
+
+
+@dataclass(slots=True, kw_only=True)
 class PersonalityData:
     """Structured data representing personality research results."""
     person_name: str
@@ -25,26 +116,43 @@ class PersonalityData:
     personality_traits: List[str] = field(default_factory=list)
     sources: List[str] = field(default_factory=list)
     confidence_score: float = 0.0
-    search_results: List[Dict] = field(default_factory=list)
-    extracted_content: List[str] = field(default_factory=list)
     research_timestamp: float = field(default_factory=time.time)
+    debug: Optional[PersonalityDebug] = None
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class CacheEntry:
     """Cache entry for personality research results."""
     data: PersonalityData
-    timestamp: float
+    timestamp: float  # time.monotonic() when cached
     ttl: float
 
 
 class PersonalityResearcher:
     """Utility class for researching personality data using Tavily Search API."""
     
-    def __init__(self, config: PersonalityResearcherConfig):
+    def __init__(self, config: PersonalityResearcherConfig, http_client: Optional[httpx.AsyncClient] = None):
         self.config = config
+        
+        # Connection pool supplied by the caller, who also closes it; otherwise one is created on first use
+        self._http_client = http_client
         self.cache: Dict[str, CacheEntry] = {}
         
+        # Min-heap of (expires_at, person_name) for sweeping expired cache entries
+        self._expiry_heap: List[Tuple[float, str]] = []
+        
+        # Research tasks in progress, so concurrent callers for one person share the work
+        self._inflight: Dict[str, "asyncio.Future[PersonalityData]"] = {}
+        
+        # Quote extraction results keyed by content hash: key -> (timestamp, (quotes, communication_style))
+        self._llm_cache: "OrderedDict[str, Tuple[float, Tuple[List[Dict], str]]]" = OrderedDict()
+        
+        # Extracted page content, already truncated for quote extraction, keyed by URL: url -> (timestamp, content)
+        self._url_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        
+        # OpenAI client for quote extraction, created on first use
+        self._openai: Optional[AsyncOpenAI] = None
+        
         # Initialize Tavily tools
         self.tavily_search = TavilySearch(
             max_results=config.max_search_results,
@@ -57,7 +165,24 @@ class PersonalityResearcher:
             include_images=config.include_images
         )
         
-        logger.info(f"Initialized with config: max_results={config.max_search_results}, cache_ttl={config.cache_ttl}s")
+        logger.info("Initialized with config: max_results=%s, cache_ttl=%ss", config.max_search_results, config.cache_ttl)
+
+    def _get_openai(self) -> AsyncOpenAI:
+        """Get the OpenAI client, creating it on first use so its connection pool is reused."""
+        if self._openai is None:
+            # Use the caller's pool, or the one shared by every researcher on this event loop
+            http_client = self._http_client or _get_shared_http_client()
+            self._openai = AsyncOpenAI(
+                api_key=self.config.openai_api_key,
+                max_retries=5,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                http_client=http_client
+            )
+        return self._openai
+
+    async def aclose(self) -> None:
+        """Drop the OpenAI client; its pool is caller-supplied or shared, so it is left open."""
+        self._openai = None
 
     def _get_cached_personality(self, person_name: str) -> Optional[PersonalityData]:
         """Get cached personality data if it exists and is not expired."""
@@ -65,23 +190,36 @@ class PersonalityResearcher:
         if not cached:
             return None
         
-        now = time.time()
+        now = time.monotonic()
         if now - cached.timestamp > cached.ttl:
             del self.cache[person_name]
-            logger.info(f"Cache expired for {person_name}")
+            logger.info("Cache expired for %s", person_name)
             return None
         
-        logger.info(f"Using cached data for {person_name}")
+        logger.info("Using cached data for %s", person_name)
         return cached.data
 
     def _cache_personality(self, person_name: str, data: PersonalityData) -> None:
         """Cache personality data with timestamp."""
-        self.cache[person_name] = CacheEntry(
+        self._sweep_expired()
+        entry = CacheEntry(
             data=data,
-            timestamp=time.time(),
+            timestamp=time.monotonic(),
             ttl=self.config.cache_ttl
         )
-        logger.info(f"Cached data for {person_name}")
+        self.cache[person_name] = entry
+        heapq.heappush(self._expiry_heap, (entry.timestamp + entry.ttl, person_name))
+        logger.info("Cached data for %s", person_name)
+
+    def _sweep_expired(self) -> None:
+        """Drop expired cache entries, popping only the heap entries that are due."""
+        now = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            expires_at, person_name = heapq.heappop(self._expiry_heap)
+            entry = self.cache.get(person_name)
+            # Skip heap entries left behind by a re-cache or clear_cache
+            if entry is not None and entry.timestamp + entry.ttl == expires_at:
+                del self.cache[person_name]
 
     async def research_person(self, person_name: str) -> PersonalityData:
         """Main method to research personality data for a given person."""
@@ -91,104 +229,201 @@ class PersonalityResearcher:
             if cached_data:
                 return cached_data
             
-            logger.info(f"Starting research for {person_name}")
+            # Join an in-flight research for the same person instead of repeating it
+            task = self._inflight.get(person_name)
+            if task is None:
+                task = asyncio.ensure_future(self._research(person_name))
+                self._inflight[person_name] = task
+                task.add_done_callback(lambda _: self._inflight.pop(person_name, None))
+            else:
+                logger.info("Joining in-flight research for %s", person_name)
+            
+            # Shield so a cancelled caller does not cancel the work other callers await
+            return await asyncio.shield(task)
+            
+        except Exception as e:
+            logger.error("Error researching %s: %s", person_name, e)
+            return self._create_fallback_data(person_name)
+
+    async def _research(self, person_name: str) -> PersonalityData:
+        """Search, extract and process personality data, caching the result."""
+        try:
+            logger.info("Starting research for %s", person_name)
             
             # Perform search
             search_results = await self._search_personality(person_name)
             
             if not search_results:
-                logger.warning(f"No search results found for {person_name}")
+                logger.warning("No search results found for %s", person_name)
                 return self._create_fallback_data(person_name)
             
-            # Extract content from top results
-            extracted_content = await self._extract_content(search_results)
+            # Truncating pages needs the encoding; its first load can download the BPE file
+            await warm_encoding()
+            
+            # Extract content from top results, analyzing each page as soon as it arrives
+            extracted_content, extraction_results = await self._extract_and_analyze(person_name, search_results)
             
             # Process and structure the data
-            personality_data = await self._process_results(person_name, search_results, extracted_content)
+            personality_data = self._process_results(person_name, search_results, extracted_content, extraction_results)
             
             # Cache the result
             self._cache_personality(person_name, personality_data)
             
-            logger.info(f"Research completed for {person_name}")
+            logger.info("Research completed for %s", person_name)
             return personality_data
             
         except Exception as e:
-            logger.error(f"Error researching {person_name}: {e}")
+            logger.error("Error researching %s: %s", person_name, e)
             return self._create_fallback_data(person_name)
 
+    def _top_results(self, results: List[Dict]) -> List[Dict]:
+        """Keep results with valid URLs, highest score first, up to max_extract_results."""
+        results_with_urls = [result for result in results if result.get('url')]
+        sorted_results = sorted(results_with_urls, key=lambda x: x.get('score', 0), reverse=True)
+        return sorted_results[:self.config.max_extract_results]
+
     async def _search_personality(self, person_name: str) -> List[Dict]:
         """Search for personality information about the person."""
+        # Start the fallback search right away so a weak primary search costs no extra round trip
+        fallback_task = asyncio.create_task(self._fallback_search(person_name))
         try:
             # Primary search for quotes
             primary_query = f"{person_name} quotes that were said by themself and reflects their personality and way of thinking on startups and crypto"
-            logger.info(f"Primary search: '{primary_query}'")
+            logger.info("Primary search: '%s'", primary_query)
             
-            search_result = self.tavily_search.invoke({"query": primary_query})
+            search_result = await self.tavily_search.ainvoke({"query": primary_query})
             all_results = search_result.get('results', [])
             
-            # Filter results with valid URLs
-            results_with_urls = [result for result in all_results if result.get('url')]
-            
-            if not results_with_urls:
-                logger.info(f"No URLs found, trying fallback search")
-                return await self._fallback_search(person_name)
+            # Sort by score and get top results with valid URLs
+            top_results = self._top_results(all_results)
             
-            # Sort by score and get top results
-            sorted_results = sorted(results_with_urls, key=lambda x: x.get('score', 0), reverse=True)
-            top_results = sorted_results[:self.config.max_extract_results]
+            if not top_results:
+                logger.info("No URLs found, using fallback search")
+                return await fallback_task
             
-            logger.info(f"Found {len(top_results)} high-quality results")
+            logger.info("Found %s high-quality results", len(top_results))
             return top_results
             
         except Exception as e:
-            logger.error(f"Error in primary search: {e}")
+            logger.error("Error in primary search: %s", e)
             return []
+        finally:
+            if not fallback_task.done():
+                fallback_task.cancel()
 
     async def _fallback_search(self, person_name: str) -> List[Dict]:
         """Fallback search for talking style and personality."""
         try:
             fallback_query = f"{person_name} talking style personality communication"
-            logger.info(f"Fallback search: '{fallback_query}'")
+            logger.info("Fallback search: '%s'", fallback_query)
             
-            fallback_result = self.tavily_search.invoke({"query": fallback_query})
-            fallback_results = fallback_result.get('results', [])
+            fallback_result = await self.tavily_search.ainvoke({"query": fallback_query})
             
             # Filter and sort fallback results
-            results_with_urls = [result for result in fallback_results if result.get('url')]
-            sorted_results = sorted(results_with_urls, key=lambda x: x.get('score', 0), reverse=True)
-            top_results = sorted_results[:self.config.max_extract_results]
+            top_results = self._top_results(fallback_result.get('results', []))
             
-            logger.info(f"Fallback found {len(top_results)} results")
+            logger.info("Fallback found %s results", len(top_results))
             return top_results
             
         except Exception as e:
-            logger.error(f"Error in fallback search: {e}")
+            logger.error("Error in fallback search: %s", e)
             return []
 
-    async def _extract_content(self, search_results: List[Dict]) -> List[str]:
-        """Extract full content from search result URLs."""
+    async def _extract_url(self, url: str) -> str:
+        """Extract the content of one URL, truncated to MAX_CONTENT_TOKENS, serving it from the URL cache when possible."""
+        content = self._get_cached_content(url)
+        if content is not None:
+            return content
+        
         try:
-            urls = [result.get('url') for result in search_results if result.get('url')]
-            
-            if not urls:
-                logger.warning("No URLs to extract")
-                return []
-            
-            logger.info(f"Extracting content from {len(urls)} URLs")
-            extract_result = self.tavily_extract.invoke({"urls": urls})
-            
-            extracted_content = []
-            for result in extract_result.get('results', []):
-                content = result.get('raw_content', '')
-                if content:
-                    extracted_content.append(content)
-            
-            logger.info(f"Successfully extracted {len(extracted_content)} content pieces")
-            return extracted_content
-            
+            extract_result = await self.tavily_extract.ainvoke({"urls": [url]})
         except Exception as e:
-            logger.error(f"Error extracting content: {e}")
-            return []
+            logger.error("Error extracting content from %s: %s", url, e)
+            return ""
+        
+        for result in extract_result.get('results', []):
+            content = result.get('raw_content', '')
+            if content:
+                # Only the truncated text is ever sent for quote extraction, so the full page is not kept
+                content = _truncate_content(content)
+                self._cache_content(url, content)
+                return content
+        return ""
+
+    async def _extract_and_analyze(self, person_name: str, search_results: List[Dict]) -> Tuple[List[str], List[Any]]:
+        """Extract content from search result URLs, starting LLM quote extraction on each page as it completes."""
+        # Deduplicate while keeping search order
+        urls = list(dict.fromkeys(result.get('url') for result in search_results if result.get('url')))
+        
+        if not urls:
+            logger.warning("No URLs to extract")
+            return [], []
+        
+        logger.info("Extracting content from %s URLs", len(urls))
+        semaphore = asyncio.Semaphore(self.config.llm_concurrency)
+        
+        async def extract_page(index: int, url: str) -> Tuple[int, str]:
+            return index, await self._extract_url(url)
+        
+        async def extract_quotes(content: str):
+            async with semaphore:
+                return await self._extract_quotes_with_llm(content, person_name)
+        
+        # Pages in search order (by index) with the quote extraction started for each
+        pages: Dict[int, Tuple[str, "asyncio.Task"]] = {}
+        for next_page in asyncio.as_completed([extract_page(index, url) for index, url in enumerate(urls)]):
+            index, content = await next_page
+            if content:
+                pages[index] = (content, asyncio.create_task(extract_quotes(content)))
+        
+        ordered = [pages[index] for index in sorted(pages)]
+        extraction_results = await asyncio.gather(*(task for _, task in ordered), return_exceptions=True)
+        
+        logger.info("Successfully extracted %s content pieces", len(ordered))
+        return [content for content, _ in ordered], extraction_results
+
+    def _get_cached_content(self, url: str) -> Optional[str]:
+        """Get cached page content for a URL if it exists and is not expired."""
+        cached = self._url_cache.get(url)
+        if cached is None:
+            return None
+        timestamp, content = cached
+        if time.monotonic() - timestamp >= self.config.cache_ttl:
+            del self._url_cache[url]
+            return None
+        self._url_cache.move_to_end(url)
+        return content
+
+    def _cache_content(self, url: str, content: str) -> None:
+        """Cache page content for a URL, evicting the least recently used entry when full."""
+        self._url_cache[url] = (time.monotonic(), content)
+        self._url_cache.move_to_end(url)
+        if len(self._url_cache) > MAX_URL_CACHE_SIZE:
+            self._url_cache.popitem(last=False)
+
+    def _llm_cache_key(self, content: str, person_name: str) -> str:
+        """Build a versioned key from everything that determines the extraction result."""
+        prefix = f"{person_name}|{QUOTE_EXTRACTION_MODEL}|{PROMPT_VERSION}|".encode()
+        return hashlib.blake2b(prefix + content.encode(), digest_size=16).hexdigest()
+
+    def _get_cached_quotes(self, key: str) -> Optional[Tuple[List[Dict], str]]:
+        """Get a cached quote extraction result if it exists and is not expired."""
+        cached = self._llm_cache.get(key)
+        if cached is None:
+            return None
+        timestamp, result = cached
+        if time.monotonic() - timestamp >= self.config.cache_ttl:
+            del self._llm_cache[key]
+            return None
+        self._llm_cache.move_to_end(key)
+        return result
+
+    def _cache_quotes(self, key: str, result: Tuple[List[Dict], str]) -> None:
+        """Cache a quote extraction result, evicting the least recently used entry when full."""
+        self._llm_cache[key] = (time.monotonic(), result)
+        self._llm_cache.move_to_end(key)
+        if len(self._llm_cache) > MAX_LLM_CACHE_SIZE:
+            self._llm_cache.popitem(last=False)
 
     def _create_quote_extraction_prompt(self, content: str, person_name: str) -> str:
         """Create a prompt for LLM to extract meaningful quotes and communication style."""
@@ -196,7 +431,7 @@ class PersonalityResearcher:
 You are an expert at extracting meaningful quotes and analyzing communication styles from text. Analyze content about {person_name}.
 
 CONTENT TO ANALYZE:
-{content[:8000]}  # Limit content length for API
+{content}
 
 INSTRUCTIONS:
 1. Find quotes that {person_name} actually said or wrote
@@ -224,74 +459,69 @@ FORMAT YOUR RESPONSE AS JSON:
 PRIORITY: Focus on longer, more substantial quotes that provide deeper insights into {person_name}'s thinking and philosophy.
 """
 
+    def _quote_extraction_request(self, content: str, person_name: str) -> Dict[str, Any]:
+        """Build the chat completion parameters for extracting quotes from already truncated content."""
+        return {
+            "model": QUOTE_EXTRACTION_MODEL,
+            "messages": [
+                {"role": "system", "content": "You are an expert at extracting meaningful quotes and analyzing communication styles from text."},
+                {"role": "user", "content": self._create_quote_extraction_prompt(content, person_name)}
+            ],
+            "temperature": 0.1,  # Low temperature for consistent extraction
+            "max_tokens": MAX_RESPONSE_TOKENS,
+            "response_format": {"type": "json_object"}  # Response is a bare JSON object
+        }
+
+    def _parse_quote_extraction(self, response_text: str, finish_reason: Optional[str] = None) -> Optional[Tuple[List[Dict], str]]:
+        """Parse a quote extraction response into (quotes, communication_style), or None if it is not valid JSON."""
+        if finish_reason == "length":
+            logger.warning("Quote extraction reply was cut off at max_tokens=%s", MAX_RESPONSE_TOKENS)
+        try:
+            result = orjson.loads(response_text)
+        except orjson.JSONDecodeError as e:
+            if finish_reason == "length":
+                logger.error("Dropping quotes from a page whose extraction reply was truncated: %s", e)
+            else:
+                logger.error("Failed to parse JSON from LLM response: %s", e)
+            return None
+        
+        quotes = result.get('quotes', [])
+        communication_style = result.get('communication_style', '')
+        logger.info("Successfully extracted %s quotes and communication style from LLM response", len(quotes))
+        return quotes, communication_style
+
     async def _extract_quotes_with_llm(self, content: str, person_name: str) -> List[Dict]:
         """Use LLM to intelligently extract quotes from content."""
         try:
-            from openai import AsyncOpenAI
-            
-            # Initialize OpenAI client
-            client = AsyncOpenAI(api_key=self.config.openai_api_key)
+            # Limit content length for API
+            content = _truncate_content(content)
+            cache_key = self._llm_cache_key(content, person_name)
+            cached = self._get_cached_quotes(cache_key)
+            if cached is not None:
+                logger.info("Using cached quote extraction for %s", person_name)
+                return cached
             
-            # Create prompt
-            prompt = self._create_quote_extraction_prompt(content, person_name)
+            client = self._get_openai()
             
             # Call LLM
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",  # Fast and cost-effective
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting meaningful quotes and analyzing communication styles from text."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,  # Low temperature for consistent extraction
-                max_tokens=1000
-            )
+            response = await client.chat.completions.create(**self._quote_extraction_request(content, person_name))
             
             # Parse response
-            response_text = response.choices[0].message.content
-            
-            # Extract JSON from response
-            import json
-            import re
-            
-            # Find JSON in response (handle cases where LLM adds extra text)
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    result = json.loads(json_match.group())
-                    quotes = result.get('quotes', [])
-                    communication_style = result.get('communication_style', '')
-                    logger.info(f"Successfully extracted {len(quotes)} quotes and communication style from LLM response")
-                    return quotes, communication_style
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON from LLM response: {e}")
-                    return [], ""
-            else:
-                logger.warning("No JSON found in LLM response")
+            choice = response.choices[0]
+            result = self._parse_quote_extraction(choice.message.content, choice.finish_reason)
+            if result is None:
                 return [], ""
             
+            self._cache_quotes(cache_key, result)
+            return result
+            
         except Exception as e:
-            logger.error(f"Error extracting quotes with LLM: {e}")
+            logger.error("Error extracting quotes with LLM: %s", e)
             return [], ""
 
-    def _process_llm_quotes(self, llm_quotes: List[Dict]) -> List[str]:
-        """Process quotes extracted by LLM - trust LLM's judgment."""
-        
-        logger.info(f"Processing {len(llm_quotes)} quotes from LLM")
-        
-        # Simply extract quote text from LLM results
-        quotes = []
-        for quote_data in llm_quotes:
-            quote_text = quote_data.get('quote', '')
-            if quote_text.strip():
-                quotes.append(quote_text)
-        
-        logger.info(f"Final quotes after processing: {len(quotes)}")
-        return quotes[:10]  # Limit to top 10 quotes
-
-    async def _process_results(self, person_name: str, search_results: List[Dict], extracted_content: List[str]) -> PersonalityData:
-        """Process results using LLM for quote extraction."""
+    def _process_results(self, person_name: str, search_results: List[Dict], extracted_content: List[str], extraction_results: List[Any]) -> PersonalityData:
+        """Process search results and LLM quote extractions into PersonalityData."""
         try:
-            quotes = []
             personality_traits = []
             sources = []
             communication_styles = []
@@ -307,22 +537,24 @@ PRIORITY: Focus on longer, more substantial quotes that provide deeper insights
                     sources.append(url)
                 
                 # Extract personality traits from title and content
-                if any(trait in title.lower() or trait in content.lower() 
-                       for trait in ['philosophy', 'thinking', 'style', 'personality', 'approach']):
+                if _TRAIT_PATTERN.search(title) or _TRAIT_PATTERN.search(content):
                     personality_traits.append(f"Score {score:.2f}: {title}")
             
-            # Use LLM to extract quotes and communication style from full content
+            # Collect quotes and communication styles extracted by the LLM from full content
             all_quotes = []
-            for content in extracted_content:
-                content_quotes, content_style = await self._extract_quotes_with_llm(content, person_name)
+            for extraction in extraction_results:
+                if isinstance(extraction, Exception):
+                    logger.error("Error extracting quotes from content: %s", extraction)
+                    continue
+                content_quotes, content_style = extraction
                 all_quotes.extend(content_quotes)
                 if content_style:
                     communication_styles.append(content_style)
             
-            logger.info(f"Total quotes extracted from all content: {len(all_quotes)}")
+            logger.info("Total quotes extracted from all content: %s", len(all_quotes))
             
-            # Process quotes
-            quotes = self._process_llm_quotes(all_quotes)
+            # Keep the text of the top 5 non-empty quotes, trusting the LLM's selection
+            quotes = [text for text in (quote_data.get('quote', '') for quote_data in all_quotes) if text.strip()][:5]
             
             # Combine communication styles
             talking_style = self._combine_communication_styles(communication_styles) if communication_styles else "Professional and direct communication style"
@@ -330,22 +562,21 @@ PRIORITY: Focus on longer, more substantial quotes that provide deeper insights
             # Calculate confidence score
             confidence_score = sum(result.get('score', 0) for result in search_results) / len(search_results) if search_results else 0.0
             
-            logger.info(f"Final results: {len(quotes)} quotes, {len(personality_traits)} traits, confidence: {confidence_score:.2f}")
+            logger.info("Final results: %s quotes, %s traits, confidence: %.2f", len(quotes), len(personality_traits), confidence_score)
             
             return PersonalityData(
                 person_name=person_name,
-                quotes=quotes[:5],  # Top 5 quotes
+                quotes=quotes,
                 talking_style=talking_style,
                 personality_traits=personality_traits[:10],
                 sources=sources,
                 confidence_score=confidence_score,
-                search_results=search_results,
-                extracted_content=extracted_content,
-                research_timestamp=time.time()
+                research_timestamp=time.time(),
+                debug=PersonalityDebug(search_results, extracted_content) if self.config.keep_raw else None
             )
             
         except Exception as e:
-            logger.error(f"Error processing results: {e}")
+            logger.error("Error processing results: %s", e)
             return self._create_fallback_data(person_name)
 
     def _combine_communication_styles(self, styles: List[str]) -> str:
@@ -369,8 +600,6 @@ PRIORITY: Focus on longer, more substantial quotes that provide deeper insights
             personality_traits=[f"Professional approach to communication"],
             sources=[],
             confidence_score=0.0,
-            search_results=[],
-            extracted_content=[],
             research_timestamp=time.time()
         )
 
@@ -410,11 +639,11 @@ Remember: You are {person_name}, not a generic AI assistant.""")
             
             system_prompt = "\n\n".join(prompt_parts)
             
-            logger.info(f"Generated system prompt for {person_name} (confidence: {personality_data.confidence_score:.2f})")
+            logger.info("Generated system prompt for %s (confidence: %.2f)", person_name, personality_data.confidence_score)
             return system_prompt
             
         except Exception as e:
-            logger.error(f"Error generating system prompt: {e}")
+            logger.error("Error generating system prompt: %s", e)
             return self._generate_fallback_prompt(person_name)
 
     def _generate_fallback_prompt(self, person_name: str) -> str:
@@ -430,14 +659,18 @@ Respond helpfully and concisely."""
         if person_name:
             if person_name in self.cache:
                 del self.cache[person_name]
-                logger.info(f"Cleared cache for {person_name}")
+                logger.info("Cleared cache for %s", person_name)
         else:
             self.cache.clear()
+            self._expiry_heap.clear()
+            self._llm_cache.clear()
+            self._url_cache.clear()
             logger.info("Cleared all cache")
 
     def get_cache_info(self) -> Dict[str, Any]:
         """Get information about the current cache state."""
-        now = time.time()
+        self._sweep_expired()
+        now = time.monotonic()
         cache_info = {
             'total_entries': len(self.cache),
             'entries': {}
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tavily Cache - Disk cache for the Tavily demo scripts
+Stores search and extract responses as JSON so repeated demo runs skip the network
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+from langchain_tavily import TavilySearch, TavilyExtract
+
+CACHE_DIR = Path(__file__).parent / ".tavily_cache"
+CACHE_TTL = 7 * 24 * 60 * 60  # 7 days in seconds
+
+
+def _cache_key(payload: Dict[str, Any]) -> str:
+    """Build a content-addressed key from everything that determines the response."""
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _load(key: str) -> Optional[Dict[str, Any]]:
+    """Load a cached response if it exists and is younger than CACHE_TTL."""
+    path = CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime >= CACHE_TTL:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _store(key: str, response: Dict[str, Any]) -> None:
+    """Write a response to the cache directory."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    (CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(response))
+
+
+async def cached_search(tavily_search: TavilySearch, query: str) -> Dict[str, Any]:
+    """Run a Tavily search, serving repeated queries from the disk cache."""
+    key = _cache_key({
+        "tool": "search",
+        "query": query,
+        "max_results": tavily_search.max_results,
+        "topic": tavily_search.topic,
+        "search_depth": tavily_search.search_depth
+    })
+    response = _load(key)
+    if response is None:
+        response = await tavily_search.ainvoke({"query": query})
+        if not response.get("error"):
+            _store(key, response)
+    return response
+
+
+async def cached_extract(tavily_extract: TavilyExtract, url: str) -> Dict[str, Any]:
+    """Extract one URL with Tavily, serving previously extracted URLs from the disk cache."""
+    key = _cache_key({
+        "tool": "extract",
+        "url": url,
+        "extract_depth": tavily_extract.extract_depth,
+        "include_images": tavily_extract.include_images
+    })
+    response = _load(key)
+    if response is None:
+        response = await tavily_extract.ainvoke({"urls": [url]})
+        if response.get("results"):
+            _store(key, response)
+    return response
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tavily Demo - Compare Search Snippets with Full Extracted Content
+Searches for a query, extracts the full content of the result URLs and reports the difference
+"""
+
+import os
+import io
+import sys
+import asyncio
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_tavily import TavilySearch, TavilyExtract
+from dotenv import load_dotenv
+
+from tavily_cache import cached_search, cached_extract
+
+# Characters of extracted page content kept in memory for display
+PREVIEW_CHARS = 1000
+
+
+def setup_tavily_api_key():
+    """Get the Tavily API key from the environment, failing fast if it is missing."""
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        raise RuntimeError("TAVILY_API_KEY not set; export it or add it to a .env file")
+    return api_key
+
+
+@functools.lru_cache(maxsize=None)
+def get_tools(max_results: int) -> Tuple[TavilySearch, TavilyExtract]:
+    """Get the Tavily Search and Extract tools, built once per max_results and reused across queries."""
+    tavily_search = TavilySearch(
+        max_results=max_results,
+        topic="general",
+        search_depth="basic"
+    )
+
+    tavily_extract = TavilyExtract(
+        extract_depth="advanced",
+        include_images=False
+    )
+
+    return tavily_search, tavily_extract
+
+
+def result_score(result: Dict[str, Any]) -> float:
+    """Score used for ranking; results carrying a null score rank last instead of breaking the sort."""
+    return result.get('score') or 0.0
+
+
+async def extract_urls(tavily_extract: TavilyExtract, urls: List[str]) -> Dict[str, Any]:
+    """Extract each URL concurrently (or from the disk cache) and merge the responses into one extract result."""
+    responses = await asyncio.gather(
+        *[cached_extract(tavily_extract, url) for url in urls],
+        return_exceptions=True
+    )
+
+    # Wall time is bounded by the slowest URL, not the sum
+    extract_result = {"results": [], "failed_results": [], "response_time": 0.0, "results_by_url": {}}
+    for url, response in zip(urls, responses):
+        if isinstance(response, Exception):
+            extract_result["failed_results"].append({"url": url, "error": str(response)})
+            continue
+        # Keep only a preview of each page; the full body is only needed for its length
+        for result in response.get("results", []):
+            raw_content = result.get("raw_content") or ""
+            result["raw_content_len"] = len(raw_content)
+            result["raw_content"] = raw_content[:PREVIEW_CHARS]
+            extract_result["results"].append(result)
+            extract_result["results_by_url"][url] = result
+        extract_result["failed_results"].extend(response.get("failed_results", []))
+        extract_result["response_time"] = max(extract_result["response_time"], response.get("response_time", 0.0))
+    return extract_result
+
+
+async def search_and_extract(query: str, *, max_results: int = 3, top_k: Optional[int] = None) -> Dict[str, Any]:
+    """Search for content and then extract full content from URLs.
+
+    With top_k set, only the top_k highest-scoring results are extracted; otherwise
+    every result with a URL is. Returns the search and extract responses.
+    """
+    tavily_search, tavily_extract = get_tools(max_results)
+
+    print(f"🚀 Searching for '{query}'...")
+    search_result = await cached_search(tavily_search, query)
+
+    print(f"\n📊 Search Results for: '{query}'")
+    print(f"📝 Found {len(search_result.get('results', []))} results")
+
+    # Filter results that have valid URLs first
+    all_results = search_result.get('results', [])
+    results_with_urls = [result for result in all_results if result.get('url')]
+
+    if not results_with_urls:
+        print("🔄 Trying fallback search for talking style and personality...")
+
+        fallback_query = f"{' '.join(query.split()[:2])} talking style personality communication"
+        print(f"🔍 Fallback search: '{fallback_query}'")
+
+        fallback_result = await cached_search(tavily_search, fallback_query)
+        fallback_results_with_urls = [result for result in fallback_result.get('results', []) if result.get('url')]
+
+        if not fallback_results_with_urls:
+            print("❌ Still no results with valid URLs found in fallback search")
+            print("📋 Showing all search results without extraction:")
+            for i, result in enumerate(all_results, 1):
+                print(f"  {i}. Score: {result.get('score', 'N/A')} - {result.get('title', 'N/A')}")
+                print(f"     Content: {result.get('content', 'N/A')[:200]}...")
+            return {"query": query, "search_result": search_result, "extract_result": None}
+
+        # Use fallback results
+        search_result = fallback_result
+        results_with_urls = fallback_results_with_urls
+        print(f"✅ Found {len(fallback_results_with_urls)} results with URLs in fallback search")
+
+    if top_k is None:
+        selected_results, other_results = results_with_urls, []
+    else:
+        # Sort by score (highest first) and keep the top_k
+        sorted_results = sorted(results_with_urls, key=result_score, reverse=True)
+        selected_results, other_results = sorted_results[:top_k], sorted_results[top_k:]
+
+        print(f"\n🏆 Top {top_k} highest-scoring results with valid URLs:")
+        for i, result in enumerate(selected_results, 1):
+            print(f"  {i}. Score: {result.get('score', 'N/A')} - {result.get('title', 'N/A')}")
+            print(f"     URL: {result.get('url', 'N/A')}")
+
+    # Deduplicate while keeping order; each URL is extracted once
+    urls = list(dict.fromkeys(result.get('url') for result in selected_results))
+
+    print(f"\n🔗 URLs to extract: {urls}")
+
+    # Extract full content from the selected URLs
+    print("\n📄 Extracting full content from URLs...")
+    extract_result = await extract_urls(tavily_extract, urls)
+
+    print(f"\n✅ Extraction completed!")
+    print(f"⏱️  Response time: {extract_result.get('response_time', 'N/A')} seconds")
+    print(f"📄 Successful extractions: {len(extract_result.get('results', []))}")
+    print(f"❌ Failed extractions: {len(extract_result.get('failed_results', []))}")
+
+    # Build the report in memory and write it in one go
+    report = io.StringIO()
+
+    # Compare search snippets vs full content
+    # Pair each search result with its own extraction, so failed URLs don't shift the pairing
+    for i, search_result_item in enumerate(selected_results):
+        extract_result_item = extract_result["results_by_url"].get(search_result_item.get('url'))
+        if extract_result_item is None:
+            continue
+        print(f"\n{'='*60}", file=report)
+        if top_k is None:
+            print(f"📰 Result {i+1}: {search_result_item.get('title', 'N/A')}", file=report)
+        else:
+            print(f"🏆 TOP {i+1} RESULT (Score: {search_result_item.get('score', 'N/A')})", file=report)
+            print(f"📰 Title: {search_result_item.get('title', 'N/A')}", file=report)
+        print(f"🔗 URL: {search_result_item.get('url', 'N/A')}", file=report)
+
+        snippet = search_result_item.get('content', '')
+        snippet_len = len(snippet)
+        print(f"\n📝 SEARCH SNIPPET (from Tavily Search):", file=report)
+        print(f"Length: {snippet_len} characters", file=report)
+        print(f"Content: {search_result_item.get('content', 'N/A')}", file=report)
+
+        print(f"\n📄 FULL CONTENT (from Tavily Extract):", file=report)
+        full_len = extract_result_item['raw_content_len']
+        preview = extract_result_item['raw_content'][:500]
+        print(f"Length: {full_len} characters", file=report)
+        print(f"First 500 chars: {preview}...", file=report)
+
+        print(f"\n💡 DIFFERENCE:", file=report)
+        print(f"Search snippet is {snippet_len} chars", file=report)
+        print(f"Full content is {full_len} chars", file=report)
+        print(f"Ratio: {snippet_len / full_len * 100 if full_len else 0.0:.1f}% of full content", file=report)
+
+    # Show other results that weren't extracted
+    if other_results:
+        print(f"\n📋 Other results with URLs (not extracted due to lower scores):", file=report)
+        for i, result in enumerate(other_results, len(selected_results) + 1):
+            print(f"  {i}. Score: {result.get('score', 'N/A')} - {result.get('title', 'N/A')}", file=report)
+
+    # Show results without URLs (if any)
+    results_without_urls = [result for result in search_result.get('results', []) if not result.get('url')]
+    if results_without_urls:
+        print(f"\n⚠️  Results without URLs (excluded from extraction):", file=report)
+        for i, result in enumerate(results_without_urls, 1):
+            print(f"  {i}. Score: {result.get('score', 'N/A')} - {result.get('title', 'N/A')}", file=report)
+
+    sys.stdout.write(report.getvalue())
+
+    return {"query": query, "search_result": search_result, "extract_result": extract_result}
+
+
+async def run_many(queries: List[str], **options) -> List[Dict[str, Any]]:
+    """Run search_and_extract for several queries concurrently, sharing the Tavily tools."""
+    return await asyncio.gather(*[search_and_extract(query, **options) for query in queries])
+
+
+def run_demo(*queries: str, **options) -> None:
+    """Run the demo for one or more queries, reporting a missing API key or other errors."""
+    print("🌐 Tavily Extract Demo - Search vs Full Content")
+    print("Comparing search snippets with full extracted content...")
+
+    try:
+        # Set up API key
+        setup_tavily_api_key()
+        print(f"✅ API key configured successfully")
+
+        # Perform search and extract
+        asyncio.run(run_many(list(queries), **options))
+
+        print("\n" + "=" * 60)
+        print("✅ Demo completed successfully!")
+        print("=" * 60)
+
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        print("🔗 Get your API key at: https://tavily.com/")
+    except Exception as e:
+        print(f"❌ Error occurred: {e}")
+        print("💡 Make sure you have a valid Tavily API key")
+        print("🔗 Get your API key at: https://tavily.com/")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    # Queries from the command line, e.g. python tavily_demo.py "Ada Lovelace quotes" "Alan Turing quotes"
+    run_demo(*sys.argv[1:] or ["Elon Musk quotes that were said by themself and reflects their personality and philosophy"])
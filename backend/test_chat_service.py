@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ChatService
+These tests replace the chat model with a local fake, so no API calls are made
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+import chat_service as chat_service_module
+from chat_service import ChatService, ChatServiceConfig, _RateLimiter
+
+
+class FakeChatModel:
+    """Minimal stand-in for ChatOpenAI that answers with a fixed reply."""
+
+    def __init__(self, reply: str = "Hello from the fake model", usage=None):
+        self.reply = reply
+        self.usage = usage
+        self.calls = []
+
+    async def ainvoke(self, messages):
+        self.calls.append(list(messages))
+        return AIMessage(content=self.reply, usage_metadata=self.usage)
+
+    async def astream(self, messages):
+        self.calls.append(list(messages))
+        first, *rest = self.reply.split(" ")
+        yield AIMessageChunk(content=first)
+        for word in rest:
+            yield AIMessageChunk(content=" " + word)
+        if self.usage:
+            # Like ChatOpenAI with stream_usage=True, usage arrives in a final empty chunk
+            yield AIMessageChunk(content="", usage_metadata=self.usage)
+
+
+@pytest.fixture(autouse=True)
+def clear_personality_cache():
+    """Start every test with an empty process-wide personality cache."""
+    chat_service_module._personality_cache.clear()
+    yield
+    chat_service_module._personality_cache.clear()
+
+
+def make_service(person_name: str = "TestAssistant", personality_context=None) -> ChatService:
+    """Create a ChatService with research disabled and a fake model."""
+    config = ChatServiceConfig(
+        person_name=person_name,
+        personality_context=personality_context,
+        openai_api_key="test-key",
+        enable_personality_research=False
+    )
+    service = ChatService(config)
+    service.model = FakeChatModel()
+    return service
+
+
+@pytest.fixture
+def chat_service():
+    """Create a ChatService wired to a fake model."""
+    return make_service(
+        personality_context="You are a helpful and friendly AI assistant for testing purposes."
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_conversation_info_tracks_exchanges(chat_service):
+    """Message count and token estimate follow each chat exchange."""
+    await chat_service.chat("Hi there")
+    await chat_service.chat("How are you?")
+
+    info = chat_service.get_conversation_info()
+    reply = chat_service.model.reply
+    expected_tokens = sum(
+        chat_service._count_tokens(text) for text in ("Hi there", reply, "How are you?", reply)
+    )
+
+    assert info.message_count == 2
+    assert info.estimated_tokens == expected_tokens
+    assert info.person_name == "TestAssistant"
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_conversation_info_after_truncation(chat_service):
+    """Counters stay consistent once old history is dropped."""
+    for i in range(15):
+        await chat_service.chat(f"Message {i}")
+
+    info = chat_service.get_conversation_info()
+    expected_tokens = sum(chat_service._count_tokens(msg.content) for msg in chat_service.conversation_history)
+
+    assert len(chat_service.conversation_history) == 20
+    assert info.message_count == 10
+    assert info.estimated_tokens == expected_tokens
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_clear_conversation_resets_info(chat_service):
+    """Clearing the conversation resets the counters."""
+    await chat_service.chat("Remember this")
+    chat_service.clear_conversation()
+
+    info = chat_service.get_conversation_info()
+    assert info.message_count == 0
+    assert info.estimated_tokens == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_achat_many_keeps_order_and_history(chat_service):
+    """Concurrent messages return in order and leave history untouched."""
+    await chat_service.chat("First exchange")
+
+    responses = await chat_service.achat_many(["One", "Two", "Three"])
+
+    assert responses == [chat_service.model.reply] * 3
+    assert [call[-1].content for call in chat_service.model.calls[1:]] == ["One", "Two", "Three"]
+    assert len(chat_service.conversation_history) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_rate_limiter_waits_for_capacity():
+    """The limiter debits capacity and blocks once a bucket is empty."""
+    limiter = _RateLimiter(requests_per_minute=60, tokens_per_minute=600)
+
+    await limiter.acquire(500)
+    assert limiter.available_token_capacity < 101
+
+    start = time.monotonic()
+    await limiter.acquire(110)  # Needs ~1 second of token refill
+    assert time.monotonic() - start >= 0.5
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_rate_limiter_serves_waiters_in_order():
+    """A large request waiting for capacity is not overtaken by smaller ones."""
+    limiter = _RateLimiter(requests_per_minute=0, tokens_per_minute=6000)
+    await limiter.acquire(6000)  # Drain the bucket; it refills at 100 tokens/s
+    finished = []
+
+    async def acquire(name, tokens):
+        await limiter.acquire(tokens)
+        finished.append(name)
+
+    large = asyncio.create_task(acquire("large", 50))
+    await asyncio.sleep(0)
+    small = asyncio.create_task(acquire("small", 1))
+    await asyncio.gather(large, small)
+
+    assert finished == ["large", "small"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_personality_cache_is_shared_between_services(monkeypatch):
+    """A second service for the same person reuses the cached researched personality."""
+    async def research(self):
+        return f"You are {self.person_name}, as researched."
+
+    monkeypatch.setattr(ChatService, "_build_personality_context", research)
+
+    first = make_service("Alice")
+    first_result = await first.initialize()
+
+    second = make_service("Alice")
+    second_result = await second.initialize()
+
+    assert second_result.personality_context == first_result.personality_context
+    assert second_result.data_quality.total_pieces == 0  # Served from cache
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_fallback_personality_is_not_cached():
+    """A fallback context is never cached, so a later research-enabled service is not served it."""
+    result = await make_service("Dave").initialize()
+
+    assert result.personality_context == chat_service_module._FALLBACK_TEMPLATE.format(name="Dave")
+    assert not chat_service_module._personality_cache
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_concurrent_initialize_runs_once(monkeypatch):
+    """Concurrent cold starts for one person share a single initialization."""
+    calls = []
+
+    async def slow_build(self):
+        calls.append(self)
+        await asyncio.sleep(0.05)
+        return f"You are {self.person_name}."
+
+    monkeypatch.setattr(ChatService, "_build_personality_context", slow_build)
+
+    results = await asyncio.gather(*[make_service("Bob").initialize() for _ in range(3)])
+
+    assert len(calls) == 1
+    assert {result.personality_context for result in results} == {"You are Bob."}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_achat_stream_yields_chunks_and_records_history(chat_service):
+    """Streaming yields the reply piece by piece and stores it once complete."""
+    chunks = [chunk async for chunk in chat_service.achat_stream("Stream please")]
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == chat_service.model.reply
+    assert [msg.content for msg in chat_service.conversation_history] == ["Stream please", chat_service.model.reply]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_system_message_is_reused_until_context_changes(chat_service):
+    """The same SystemMessage is sent every turn until the context is replaced."""
+    await chat_service.chat("One")
+    await chat_service.chat("Two")
+    first, second = chat_service.model.calls
+    assert first[0] is second[0]
+
+    chat_service.personality_context = "You are someone else."
+    await chat_service.chat("Three")
+    third = chat_service.model.calls[-1]
+    assert third[0] is not first[0]
+    assert third[0].content == "You are someone else."
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_concurrent_chats_auto_initialize_once(monkeypatch):
+    """Concurrent first chats on an uninitialized service initialize it once."""
+    service = make_service("Carol")
+    calls = []
+    original_initialize = ChatService.initialize
+
+    async def counting_initialize(self):
+        calls.append(self)
+        return await original_initialize(self)
+
+    monkeypatch.setattr(ChatService, "initialize", counting_initialize)
+
+    await asyncio.gather(service.chat("Hi"), service.chat("Hello"))
+
+    assert len(calls) == 1
+    assert service.is_personality_initialized()
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_last_usage_reports_streamed_prompt_cache_hits(chat_service):
+    """Usage from the final streamed chunk, including cached prompt tokens, is kept on the service."""
+    usage = {
+        "input_tokens": 1500,
+        "output_tokens": 5,
+        "total_tokens": 1505,
+        "input_token_details": {"cache_read": 1024}
+    }
+    chat_service.model = FakeChatModel(usage=usage)
+
+    reply = await chat_service.chat("Hi")
+
+    assert reply == chat_service.model.reply
+    assert chat_service.last_usage["input_token_details"]["cache_read"] == 1024
+
+
+@pytest.mark.unit
+def test_clients_are_shared_per_event_loop():
+    """Services on one loop share OpenAI clients; a new loop gets fresh ones."""
+    async def clients_for_two_services():
+        return make_service("Alice").client, make_service("Bob").client
+
+    first_a, first_b = asyncio.run(clients_for_two_services())
+    second_a, _ = asyncio.run(clients_for_two_services())
+
+    assert first_a is first_b
+    assert second_a is not first_a
@@ -4,218 +4,324 @@ Test script to verify integration between ChatService and PersonalityResearcher
 """
 
 import asyncio
+import functools
+import io
 import logging
-from chat_service import ChatService, ChatServiceConfig
+import os
+import sys
+import time
+import traceback
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+import httpx
+import pytest
+from chat_service import ChatService, ChatServiceConfig, InitializationResult, _get_encoding
 from config import get_config
+import event_loops
+from logging_config import get_report_logger
+from mock_network import LIVE, install_tavily_fixtures, make_http_client, use_fixture_keys
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Test reports are written through a queued logger instead of blocking print calls
+report_log = get_report_logger("integration_report")
+
+# The real-person scenario researches Greg Isenberg and costs API calls, so it is opt-in
+RUN_FULL_INTEGRATION = os.environ.get("RUN_FULL_INTEGRATION") == "1"
+
+# Chat model for the tests; set TEST_MODEL=gpt-4 for regression runs against the production model
+TEST_MODEL = os.environ.get("TEST_MODEL", "gpt-4o-mini")
+
+# (label, message) pairs sent to the stereotype person; the answers don't depend on each other
+STEREOTYPE_MESSAGES = (
+    ("first", "Hey Exit Bro! What's your deal?"),
+    ("second", "What's your approach to business and startups?"),
+    ("third", "What's your take on the current startup ecosystem?")
+)
+
+class CreditBudget:
+    """Fixed pool of credits; each outbound call holds its cost until it finishes."""
+
+    def __init__(self, credits: int):
+        self._available = credits
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def spend(self, credits: int) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._available >= credits)
+            self._available -= credits
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._available += credits
+                self._condition.notify_all()
+
+
+# Bounds the calls in flight, so concurrent tests stay under OpenAI and Tavily rate limits
+BUDGET = CreditBudget(20)
+CHAT_CREDITS = 1
+RESEARCH_CREDITS = 10  # One initialization fans out into several Tavily and OpenAI calls
+
+
+async def chat(chat_service: ChatService, message: str) -> str:
+    """Send a message with ChatService.chat once the budget allows."""
+    async with BUDGET.spend(CHAT_CREDITS):
+        return await chat_service.chat(message)
+
+
+async def stream_chat(chat_service: ChatService, message: str) -> Tuple[str, float]:
+    """Stream a reply with ChatService.achat_stream, returning it with the time to its first chunk."""
+    async with BUDGET.spend(CHAT_CREDITS):
+        start = time.perf_counter()
+        first_chunk_at = None
+        chunks = []
+        async for chunk in chat_service.achat_stream(message):
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            chunks.append(chunk)
+    return "".join(chunks), (first_chunk_at or time.perf_counter()) - start
+
+
+# One connection pool for every service and researcher in the run, closed by run_all_tests
+HTTP_CLIENT = make_http_client(limits=httpx.Limits(max_connections=50, max_keepalive_connections=50))
+
+# Initialized services, shared by every test for the same person
+_service_cache: Dict[str, Tuple[ChatService, InitializationResult]] = {}
+_service_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def get_service(person_name: str) -> Tuple[ChatService, InitializationResult]:
+    """Get an initialized ChatService for a person, running the personality research only once."""
+    async with _service_locks.setdefault(person_name, asyncio.Lock()):
+        if person_name not in _service_cache:
+            config = get_config()
+            chat_service = ChatService(ChatServiceConfig(
+                person_name=person_name,
+                openai_api_key=config.personality_researcher.openai_api_key,
+                model_name=TEST_MODEL,
+                enable_personality_research=True,
+                http_client=HTTP_CLIENT
+            ))
+            if not LIVE and chat_service._get_personality_researcher():
+                install_tavily_fixtures(chat_service.personality_researcher)
+            async with BUDGET.spend(RESEARCH_CREDITS):
+                init_result = await chat_service.initialize()
+            _service_cache[person_name] = (chat_service, init_result)
+    return _service_cache[person_name]
+
+
+def test_single_encoder():
+    """ChatServices for a model share one tiktoken encoding; loading its BPE table is slow."""
+    if _get_encoding(TEST_MODEL) is None:
+        pytest.skip("tiktoken encoding unavailable (offline?)")
+    first, second = (
+        ChatService(ChatServiceConfig(
+            person_name=name,
+            openai_api_key="sk-test",
+            model_name=TEST_MODEL,
+            enable_personality_research=False
+        ))
+        for name in ("Encoder A", "Encoder B")
+    )
+    assert first._encoding is not None
+    assert first._encoding is second._encoding
+
 
 async def test_chat_service_integration():
     """Test the ChatService with PersonalityResearcher integration."""
     
+    # Buffer this test's output so concurrently running tests don't interleave
+    report = io.StringIO()
+    out = functools.partial(print, file=report)
+    
     try:
-        # Get configuration
-        config = get_config()
-        
-        print("🔍 Testing ChatService with PersonalityResearcher integration")
-        print("=" * 60)
+        out("🔍 Testing ChatService with PersonalityResearcher integration")
+        out("=" * 60)
         
         # Test person
         test_person = "Greg Isenberg"
         
-        # Create ChatService config
-        chat_config = ChatServiceConfig(
-            person_name=test_person,
-            openai_api_key=config.personality_researcher.openai_api_key,
-            model_name="gpt-4",
-            enable_personality_research=True
-        )
-        
-        # Initialize ChatService
-        print(f"📝 Initializing ChatService for {test_person}")
-        chat_service = ChatService(chat_config)
+        # Get the shared, initialized ChatService
+        out(f"📝 Initializing ChatService for {test_person}")
+        chat_service, init_result = await get_service(test_person)
         
-        # Test initialization
-        print("🔄 Testing initialization...")
-        init_result = await chat_service.initialize()
-        
-        print(f"✅ Initialization completed!")
-        print(f"📊 Success: {len(init_result.errors) == 0}")
-        print(f"📝 Personality context length: {len(init_result.personality_context)}")
-        print(f"📊 Data quality: {init_result.data_quality}")
+        out(f"✅ Initialization completed!")
+        out(f"📊 Success: {len(init_result.errors) == 0}")
+        personality_context = init_result.personality_context
+        context_length = len(personality_context)
+        out(f"📝 Personality context length: {context_length}")
+        out(f"📊 Data quality: {init_result.data_quality}")
         
         if init_result.errors:
-            print(f"⚠️  Errors: {init_result.errors}")
+            out(f"⚠️  Errors: {init_result.errors}")
         
         # Show personality context
-        print(f"\n🤖 Generated Personality Context:")
-        print("-" * 40)
-        print(init_result.personality_context[:500] + "..." if len(init_result.personality_context) > 500 else init_result.personality_context)
-        print("-" * 40)
+        out(f"\n🤖 Generated Personality Context:")
+        out("-" * 40)
+        out(personality_context[:500] + "..." if context_length > 500 else personality_context)
+        out("-" * 40)
         
         # Test first chat message
-        print(f"\n💬 Testing first chat message...")
+        out(f"\n💬 Testing first chat message...")
         first_message = "Hello! Can you tell me about yourself?"
-        first_response = await chat_service.chat(first_message)
+        first_response, first_ttft = await stream_chat(chat_service, first_message)
         
-        print(f"✅ First chat test completed!")
-        print(f"💬 User: {first_message}")
-        print(f"🤖 AI: {first_response}")
+        out(f"✅ First chat test completed!")
+        out(f"💬 User: {first_message}")
+        out(f"🤖 AI: {first_response}")
+        out(f"⏱️  Time to first chunk: {first_ttft:.2f}s")
         
         # Test second chat message to verify conversation memory
-        print(f"\n💬 Testing second chat message (conversation memory)...")
+        out(f"\n💬 Testing second chat message (conversation memory)...")
         second_message = "What did I just ask you about? And can you tell me more about your approach to business?"
-        second_response = await chat_service.chat(second_message)
+        second_response, second_ttft = await stream_chat(chat_service, second_message)
+        
+        out(f"✅ Second chat test completed!")
+        out(f"💬 User: {second_message}")
+        out(f"🤖 AI: {second_response}")
+        out(f"⏱️  Time to first chunk: {second_ttft:.2f}s")
         
-        print(f"✅ Second chat test completed!")
-        print(f"💬 User: {second_message}")
-        print(f"🤖 AI: {second_response}")
+        # The personality context is the first message every turn, so OpenAI can serve it from its prompt cache
+        # (prompts need at least 1024 tokens). Caching is best effort and not every model supports it, so only report it
+        usage = chat_service.last_usage or {}
+        input_tokens = usage.get("input_tokens", 0)
+        cached_tokens = usage.get("input_token_details", {}).get("cache_read", 0)
+        hit_rate = f"{cached_tokens / input_tokens:.0%}" if input_tokens else "N/A"
+        out(f"📊 Prompt tokens: {input_tokens or 'N/A'}, served from prompt cache: {cached_tokens} ({hit_rate})")
         
         # Test third chat message to verify personality consistency
-        print(f"\n💬 Testing third chat message (personality consistency)...")
+        out(f"\n💬 Testing third chat message (personality consistency)...")
         third_message = "What's your take on community building in the digital age?"
-        third_response = await chat_service.chat(third_message)
+        third_response, third_ttft = await stream_chat(chat_service, third_message)
         
-        print(f"✅ Third chat test completed!")
-        print(f"💬 User: {third_message}")
-        print(f"🤖 AI: {third_response}")
+        out(f"✅ Third chat test completed!")
+        out(f"💬 User: {third_message}")
+        out(f"🤖 AI: {third_response}")
+        out(f"⏱️  Time to first chunk: {third_ttft:.2f}s")
         
         # Test conversation info
-        print(f"\n📊 Testing conversation info...")
-        conv_info = await chat_service.get_conversation_info()
-        print(f"✅ Conversation info: {conv_info}")
-        print(f"📊 Message count: {conv_info.message_count}")
-        print(f"📊 Estimated tokens: {conv_info.estimated_tokens}")
+        out(f"\n📊 Testing conversation info...")
+        conv_info = chat_service.get_conversation_info()
+        out(f"✅ Conversation info: {conv_info}")
+        out(f"📊 Message count: {conv_info.message_count}")
+        out(f"📊 Estimated tokens: {conv_info.estimated_tokens}")
         
         # Test conversation clearing
-        print(f"\n🗑️  Testing conversation clearing...")
-        await chat_service.clear_conversation()
-        conv_info_after_clear = await chat_service.get_conversation_info()
-        print(f"✅ Conversation cleared! New message count: {conv_info_after_clear.message_count}")
+        out(f"\n🗑️  Testing conversation clearing...")
+        chat_service.clear_conversation()
+        conv_info_after_clear = chat_service.get_conversation_info()
+        out(f"✅ Conversation cleared! New message count: {conv_info_after_clear.message_count}")
         
         # Test that personality is still maintained after clearing
-        print(f"\n💬 Testing chat after conversation clear (personality persistence)...")
+        out(f"\n💬 Testing chat after conversation clear (personality persistence)...")
         test_message_after_clear = "Hi again! What's your name?"
-        response_after_clear = await chat_service.chat(test_message_after_clear)
+        response_after_clear = await chat(chat_service, test_message_after_clear)
         
-        print(f"✅ Chat after clear test completed!")
-        print(f"💬 User: {test_message_after_clear}")
-        print(f"🤖 AI: {response_after_clear}")
+        out(f"✅ Chat after clear test completed!")
+        out(f"💬 User: {test_message_after_clear}")
+        out(f"🤖 AI: {response_after_clear}")
         
-        print(f"\n🎉 Integration test completed successfully!")
-        print(f"✅ All tests passed: initialization, personality research, conversation memory, and personality consistency!")
+        out(f"\n🎉 Integration test completed successfully!")
+        out(f"✅ All tests passed: initialization, personality research, conversation memory, and personality consistency!")
         
-    except Exception as e:
-        print(f"❌ Error occurred: {e}")
-        import traceback
-        traceback.print_exc()
+    finally:
+        report_log.info("%s", report.getvalue().rstrip("\n"))
 
 
 async def test_stereotype_person():
     """Test the ChatService with a stereotype/type of person (Exit Bro)."""
     
+    # Buffer this test's output so concurrently running tests don't interleave
+    report = io.StringIO()
+    out = functools.partial(print, file=report)
+    
     try:
-        # Get configuration
-        config = get_config()
-        
-        print("\n" + "=" * 60)
-        print("🧪 Testing ChatService with Stereotype Person: 'Exit Bro'")
-        print("=" * 60)
+        out("\n" + "=" * 60)
+        out("🧪 Testing ChatService with Stereotype Person: 'Exit Bro'")
+        out("=" * 60)
         
         # Test stereotype person
         stereotype_person = "Exit Bro"
         
-        # Create ChatService config
-        chat_config = ChatServiceConfig(
-            person_name=stereotype_person,
-            openai_api_key=config.personality_researcher.openai_api_key,
-            model_name="gpt-4",
-            enable_personality_research=True
-        )
+        # Get the shared, initialized ChatService
+        out(f"📝 Initializing ChatService for {stereotype_person}")
+        chat_service, init_result = await get_service(stereotype_person)
         
-        # Initialize ChatService
-        print(f"📝 Initializing ChatService for {stereotype_person}")
-        chat_service = ChatService(chat_config)
-        
-        # Test initialization
-        print("🔄 Testing initialization...")
-        init_result = await chat_service.initialize()
-        
-        print(f"✅ Initialization completed!")
-        print(f"📊 Success: {len(init_result.errors) == 0}")
-        print(f"📝 Personality context length: {len(init_result.personality_context)}")
-        print(f"📊 Data quality: {init_result.data_quality}")
+        out(f"✅ Initialization completed!")
+        out(f"📊 Success: {len(init_result.errors) == 0}")
+        out(f"📝 Personality context length: {len(init_result.personality_context)}")
+        out(f"📊 Data quality: {init_result.data_quality}")
         
         if init_result.errors:
-            print(f"⚠️  Errors: {init_result.errors}")
+            out(f"⚠️  Errors: {init_result.errors}")
         
         # Show personality context (this should be the fallback prompt)
-        print(f"\n🤖 Generated Personality Context for '{stereotype_person}':")
-        print("-" * 60)
-        print(init_result.personality_context)
-        print("-" * 60)
-        
-        # Test first chat message
-        print(f"\n💬 Testing first chat message...")
-        first_message = "Hey Exit Bro! What's your deal?"
-        first_response = await chat_service.chat(first_message)
+        out(f"\n🤖 Generated Personality Context for '{stereotype_person}':")
+        out("-" * 60)
+        out(init_result.personality_context)
+        out("-" * 60)
         
-        print(f"✅ First chat test completed!")
-        print(f"💬 User: {first_message}")
-        print(f"🤖 AI: {first_response}")
+        # The three questions don't depend on each other's answers, so send them concurrently
+        out(f"\n💬 Testing chat messages...")
+        responses = await asyncio.gather(*(chat(chat_service, message) for _, message in STEREOTYPE_MESSAGES))
         
-        # Test second chat message
-        print(f"\n💬 Testing second chat message...")
-        second_message = "What's your approach to business and startups?"
-        second_response = await chat_service.chat(second_message)
-        
-        print(f"✅ Second chat test completed!")
-        print(f"💬 User: {second_message}")
-        print(f"🤖 AI: {second_response}")
-        
-        # Test third chat message
-        print(f"\n💬 Testing third chat message...")
-        third_message = "What's your take on the current startup ecosystem?"
-        third_response = await chat_service.chat(third_message)
-        
-        print(f"✅ Third chat test completed!")
-        print(f"💬 User: {third_message}")
-        print(f"🤖 AI: {third_response}")
+        for (label, message), response in zip(STEREOTYPE_MESSAGES, responses):
+            out(f"\n✅ {label.capitalize()} chat test completed!")
+            out(f"💬 User: {message}")
+            out(f"🤖 AI: {response}")
         
         # Test conversation info
-        print(f"\n📊 Testing conversation info...")
-        conv_info = await chat_service.get_conversation_info()
-        print(f"✅ Conversation info: {conv_info}")
-        print(f"📊 Message count: {conv_info.message_count}")
-        print(f"📊 Estimated tokens: {conv_info.estimated_tokens}")
+        out(f"\n📊 Testing conversation info...")
+        conv_info = chat_service.get_conversation_info()
+        out(f"✅ Conversation info: {conv_info}")
+        out(f"📊 Message count: {conv_info.message_count}")
+        out(f"📊 Estimated tokens: {conv_info.estimated_tokens}")
         
-        print(f"\n🎉 Stereotype person test completed successfully!")
-        print(f"✅ Shows how system handles non-real person names and stereotypes!")
+        out(f"\n🎉 Stereotype person test completed successfully!")
+        out(f"✅ Shows how system handles non-real person names and stereotypes!")
         
-    except Exception as e:
-        print(f"❌ Error occurred: {e}")
-        import traceback
-        traceback.print_exc()
+    finally:
+        report_log.info("%s", report.getvalue().rstrip("\n"))
 
 
-async def run_all_tests():
-    """Run all integration tests."""
-    print("🚀 Starting ChatService Integration Tests")
-    print("=" * 80)
+async def run_all_tests() -> int:
+    """Run all integration tests, returning the process exit status: 0 if all passed, 1 otherwise."""
+    # Without LIVE=1, OpenAI and Tavily are answered from fixtures, so no real keys are needed
+    if not LIVE:
+        use_fixture_keys()
     
-    # Test with real person
-    # await test_chat_service_integration()
+    report_log.info("🚀 Starting ChatService Integration Tests")
+    report_log.info("=" * 80)
     
-    # Test with stereotype person
-    await test_stereotype_person()
+    try:
+        # Test with stereotype person, plus real person when enabled, concurrently;
+        # each prints its own report when done
+        tests = [test_stereotype_person()]
+        if RUN_FULL_INTEGRATION:
+            tests.append(test_chat_service_integration())
+        else:
+            report_log.info("⏭️  Skipping real-person test (set RUN_FULL_INTEGRATION=1 to run it)")
+        results = await asyncio.gather(*tests, return_exceptions=True)
+        
+        # Failures surface here, after each test has written its report
+        failures = [result for result in results if isinstance(result, Exception)]
+        for failure in failures:
+            report_log.error("❌ Error occurred: %s\n%s", failure, "".join(traceback.format_exception(failure)).rstrip())
+    finally:
+        await HTTP_CLIENT.aclose()
     
-    print("\n" + "=" * 80)
-    print("🎉 All integration tests completed!")
-    print("=" * 80)
+    report_log.info("\n" + "=" * 80)
+    if failures:
+        report_log.info(f"❌ {len(failures)} integration test(s) failed")
+    else:
+        report_log.info("🎉 All integration tests completed!")
+    report_log.info("=" * 80)
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
-    asyncio.run(run_all_tests()) 
\ No newline at end of file
+    sys.exit(event_loops.run(run_all_tests()))
\ No newline at end of file
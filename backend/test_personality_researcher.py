@@ -5,9 +5,179 @@ Demonstrates how to use the personality research utility
 """
 
 import asyncio
+import os
+import re
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from personality_researcher import PersonalityResearcher
-from config import get_config
+import httpx
+import orjson
+import pytest
+
+from personality_researcher import PersonalityResearcher, PersonalityData, PersonalityDebug, _truncate_content
+from config import PersonalityResearcherConfig, get_config
+import event_loops
+from logging_config import get_report_logger
+from mock_network import LIVE, install_tavily_fixtures, make_http_client, use_fixture_keys
+
+# Progress and results are written through a queued logger instead of blocking print calls
+report = get_report_logger("personality_research_report")
+
+# People researched by the test
+TEST_PEOPLE = ["Greg Isenberg", "Exit Bro"]
+
+# Send quote extraction through the OpenAI Batch API (half price, no RPM cap, results within 24h);
+# batches have no fixtures, so this needs LIVE=1 too
+BATCH = LIVE and os.environ.get("BATCH") == "1"
+BATCH_POLL_INTERVAL = 30  # seconds between batch status checks
+BATCH_TIMEOUT = float(os.environ.get("BATCH_TIMEOUT", 2 * 60 * 60))  # seconds before an unfinished batch is cancelled
+
+# Max research runs in flight, to stay under Tavily and OpenAI rate limits
+RESEARCH_CONCURRENCY = 10
+
+# One connection pool for the researcher's OpenAI calls, closed when the test finishes
+HTTP_CLIENT = make_http_client(limits=httpx.Limits(max_connections=50, max_keepalive_connections=50))
+
+# Research results persisted between runs, so reruns skip Tavily and OpenAI
+DISK_CACHE_DIR = Path.home() / ".cache" / "clonescouncil" / "personality"
+
+
+class DiskCachedResearcher(PersonalityResearcher):
+    """PersonalityResearcher that also keeps research results on disk for cache_ttl seconds."""
+
+    def _disk_cache_path(self, person_name: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "-", person_name.lower()).strip("-")
+        return DISK_CACHE_DIR / f"{slug}.json"
+
+    def _load_from_disk(self, person_name: str) -> Optional[PersonalityData]:
+        path = self._disk_cache_path(person_name)
+        try:
+            if time.time() - path.stat().st_mtime >= self.config.cache_ttl:
+                return None
+            data = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        debug = data.pop("debug", None)
+        return PersonalityData(**data, debug=PersonalityDebug(**debug) if debug else None)
+
+    async def research_person(self, person_name: str) -> PersonalityData:
+        """Serve research from memory, then disk, and only research people seen in neither."""
+        personality_data = self._get_cached_personality(person_name)
+        if personality_data is not None:
+            return personality_data
+
+        # Only entries loaded from disk go into the memory cache; re-caching memory hits would slide their TTL
+        personality_data = self._load_from_disk(person_name)
+        if personality_data is not None:
+            self._cache_personality(person_name, personality_data)
+            return personality_data
+
+        personality_data = await super().research_person(person_name)
+        # Fallback data from a failed research has no sources and is not worth keeping
+        if personality_data.sources:
+            DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._disk_cache_path(person_name).write_bytes(orjson.dumps(personality_data))
+        return personality_data
+
+
+async def research_many(researcher: PersonalityResearcher, names: List[str]) -> Dict[str, PersonalityData]:
+    """Research several people concurrently, at most RESEARCH_CONCURRENCY at a time."""
+    semaphore = asyncio.Semaphore(RESEARCH_CONCURRENCY)
+
+    async def research(name: str) -> PersonalityData:
+        async with semaphore:
+            return await researcher.research_person(name)
+
+    return dict(zip(names, await asyncio.gather(*(research(name) for name in names))))
+
+
+async def batch_research(researcher: PersonalityResearcher, names: List[str]) -> Dict[str, PersonalityData]:
+    """Research several people, running Tavily live and the quote extraction as one OpenAI batch.
+
+    Raises if the batch does not complete within BATCH_TIMEOUT or any request has no response.
+    Only complete results are cached.
+    """
+    # Search and extract every person's pages concurrently
+    searches = await asyncio.gather(*(researcher._search_personality(name) for name in names))
+    pages = await asyncio.gather(*(
+        asyncio.gather(*(researcher._extract_url(result["url"]) for result in results))
+        for results in searches
+    ))
+    contents = [[_truncate_content(content) for content in person_pages if content] for person_pages in pages]
+
+    # One request per page, identified by person and page index
+    requests = [
+        {
+            "custom_id": f"{person_index}-{page_index}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": researcher._quote_extraction_request(content, names[person_index])
+        }
+        for person_index, person_contents in enumerate(contents)
+        for page_index, content in enumerate(person_contents)
+    ]
+
+    responses: Dict[str, Tuple[str, Optional[str]]] = {}  # custom_id -> (content, finish_reason)
+    if requests:
+        client = researcher._get_openai()
+        batch_file = await client.files.create(
+            file=("quote_extraction.jsonl", b"\n".join(orjson.dumps(request) for request in requests)),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        report.info(f"📦 Submitted batch {batch.id} with {len(requests)} requests")
+        try:
+            async with asyncio.timeout(BATCH_TIMEOUT):
+                while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                    await asyncio.sleep(BATCH_POLL_INTERVAL)
+                    batch = await client.batches.retrieve(batch.id)
+        except TimeoutError:
+            await client.batches.cancel(batch.id)
+            raise TimeoutError(f"Batch {batch.id} did not finish within {BATCH_TIMEOUT:.0f}s and was cancelled")
+        report.info(f"📦 Batch {batch.id} finished with status: {batch.status}")
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.content.splitlines():
+                result = orjson.loads(line)
+                response = result.get("response") or {}
+                if response.get("status_code") == 200:
+                    choice = response["body"]["choices"][0]
+                    responses[result["custom_id"]] = (choice["message"]["content"], choice.get("finish_reason"))
+        missing = [request["custom_id"] for request in requests if request["custom_id"] not in responses]
+        if missing:
+            raise RuntimeError(f"Batch {batch.id} has no successful response for {len(missing)} of {len(requests)} requests")
+
+    # Turn each person's page extractions into PersonalityData, as research_person would
+    results = {}
+    for person_index, name in enumerate(names):
+        extraction_results = []
+        complete = bool(searches[person_index])
+        for page_index in range(len(contents[person_index])):
+            response_text, finish_reason = responses[f"{person_index}-{page_index}"]
+            parsed = researcher._parse_quote_extraction(response_text, finish_reason)
+            complete = complete and parsed is not None
+            extraction_results.append(parsed or ([], ""))
+        if searches[person_index]:
+            personality_data = researcher._process_results(name, searches[person_index], contents[person_index], extraction_results)
+        else:
+            personality_data = researcher._create_fallback_data(name)
+        # Fallback data and pages whose reply could not be parsed are reported but not cached
+        if complete:
+            researcher._cache_personality(name, personality_data)
+        else:
+            report.info(f"⚠️  Not caching incomplete research for {name}")
+        results[name] = personality_data
+    return results
 
 
 async def test_personality_research():
@@ -18,80 +188,144 @@ async def test_personality_research():
         config = get_config()
         personality_config = config.get_personality_researcher_config()
         
-        print(f"🔍 Testing PersonalityResearcher with centralized config")
-        print("=" * 60)
+        report.info(f"🔍 Testing PersonalityResearcher with centralized config")
+        report.info("=" * 60)
         
         # Initialize PersonalityResearcher
-        researcher = PersonalityResearcher(personality_config)
-        
-        # Test person to research
-        test_person = "Greg Isenberg"
-        
-        # Research the person
-        print("📚 Researching personality data...")
-        personality_data = await researcher.research_person(test_person)
-        
-        # Display results
-        print(f"\n✅ Research completed!")
-        print(f"📊 Confidence score: {personality_data.confidence_score:.2f}")
-        print(f"🔗 Sources found: {len(personality_data.sources)}")
-        print(f"💬 Quotes found: {len(personality_data.quotes)}")
-        print(f"🎭 Personality traits: {len(personality_data.personality_traits)}")
-        
-        # Show quotes
-        if personality_data.quotes:
-            print(f"\n💬 Representative quotes:")
-            for i, quote in enumerate(personality_data.quotes, 1):
-                print(f"  {i}. {quote}")
-        
-        # Show personality traits
-        if personality_data.personality_traits:
-            print(f"\n🎭 Personality traits:")
-            for i, trait in enumerate(personality_data.personality_traits, 1):
-                print(f"  {i}. {trait}")
+        # Fixture runs skip the disk cache, so fixture data never stands in for a live result
+        researcher_class = DiskCachedResearcher if LIVE else PersonalityResearcher
+        researcher = researcher_class(personality_config, http_client=HTTP_CLIENT)
+        if not LIVE:
+            install_tavily_fixtures(researcher)
         
-        # Show talking style
-        print(f"\n🗣️  Talking style: {personality_data.talking_style}")
+        # Research every test person
+        report.info(f"📚 Researching personality data for {len(TEST_PEOPLE)} people...")
+        results = await (batch_research if BATCH else research_many)(researcher, TEST_PEOPLE)
         
-        # Generate system prompt
-        print(f"\n🤖 Generating system prompt...")
-        system_prompt = researcher.generate_system_prompt(test_person, personality_data)
-        
-        print(f"\n📝 Generated System Prompt:")
-        print("-" * 40)
-        print(system_prompt)
-        print("-" * 40)
+        for test_person, personality_data in results.items():
+            # Display results
+            report.info(f"\n✅ Research completed for {test_person}!")
+            report.info(f"📊 Confidence score: {personality_data.confidence_score:.2f}")
+            report.info(f"🔗 Sources found: {len(personality_data.sources)}")
+            report.info(f"💬 Quotes found: {len(personality_data.quotes)}")
+            report.info(f"🎭 Personality traits: {len(personality_data.personality_traits)}")
+            
+            # Show quotes
+            if personality_data.quotes:
+                report.info(f"\n💬 Representative quotes:")
+                for i, quote in enumerate(personality_data.quotes, 1):
+                    report.info(f"  {i}. {quote}")
+            
+            # Show personality traits
+            if personality_data.personality_traits:
+                report.info(f"\n🎭 Personality traits:")
+                for i, trait in enumerate(personality_data.personality_traits, 1):
+                    report.info(f"  {i}. {trait}")
+            
+            # Show talking style
+            report.info(f"\n🗣️  Talking style: {personality_data.talking_style}")
+            
+            # Generate system prompt
+            report.info(f"\n🤖 Generating system prompt...")
+            system_prompt = researcher.generate_system_prompt(test_person, personality_data)
+            
+            report.info(f"\n📝 Generated System Prompt:")
+            report.info("-" * 40)
+            report.info("%s", system_prompt)
+            report.info("-" * 40)
         
         # Test caching
-        print(f"\n🔄 Testing cache functionality...")
-        cached_data = await researcher.research_person(test_person)
-        print(f"✅ Cache test completed (should be instant)")
+        report.info(f"\n🔄 Testing cache functionality...")
+        cached_results = await research_many(researcher, TEST_PEOPLE)
+        report.info(f"✅ Cache test completed (should be instant)")
         
         # Show cache info
         cache_info = researcher.get_cache_info()
-        print(f"\n📋 Cache information:")
-        print(f"  Total entries: {cache_info['total_entries']}")
+        report.info(f"\n📋 Cache information:")
+        report.info(f"  Total entries: {cache_info['total_entries']}")
         for person, info in cache_info['entries'].items():
-            print(f"  {person}: age={info['age_seconds']:.1f}s, expires_in={info['expires_in']:.1f}s")
+            report.info(f"  {person}: age={info['age_seconds']:.1f}s, expires_in={info['expires_in']:.1f}s")
         
         # Show config info
-        print(f"\n⚙️  Configuration info:")
-        print(f"  Max search results: {personality_config.max_search_results}")
-        print(f"  Max extract results: {personality_config.max_extract_results}")
-        print(f"  Cache TTL: {personality_config.cache_ttl}s")
-        print(f"  Search depth: {personality_config.search_depth}")
-        print(f"  Extract depth: {personality_config.extract_depth}")
+        report.info(f"\n⚙️  Configuration info:")
+        report.info(f"  Max search results: {personality_config.max_search_results}")
+        report.info(f"  Max extract results: {personality_config.max_extract_results}")
+        report.info(f"  Cache TTL: {personality_config.cache_ttl}s")
+        report.info(f"  Search depth: {personality_config.search_depth}")
+        report.info(f"  Extract depth: {personality_config.extract_depth}")
         
-        print(f"\n🎉 Test completed successfully!")
+        report.info(f"\n🎉 Test completed successfully!")
         
+    finally:
+        await HTTP_CLIENT.aclose()
+
+
+
+class FakeTavilyTool:
+    """Stand-in for TavilySearch/TavilyExtract that records how many calls overlap."""
+
+    def __init__(self, urls: List[str]):
+        self.urls = urls
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, payload: Dict) -> Dict:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            self.in_flight -= 1
+        if "urls" in payload:
+            return {"results": [{"url": payload["urls"][0], "raw_content": f"Content of {payload['urls'][0]}"}]}
+        return {"results": [{"url": url, "score": 0.9, "content": "snippet"} for url in self.urls]}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_tavily_calls_run_concurrently(monkeypatch):
+    """Searches and per-URL extractions are issued together rather than one after another."""
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+
+    async def no_quotes(self, content, person_name):
+        return [], ""
+
+    monkeypatch.setattr(PersonalityResearcher, "_extract_quotes_with_llm", no_quotes)
+
+    researcher = PersonalityResearcher(PersonalityResearcherConfig(tavily_api_key="tvly-test", openai_api_key="test-key"))
+    urls = [f"https://example.com/{i}" for i in range(researcher.config.max_extract_results)]
+    researcher.tavily_search = FakeTavilyTool(urls)
+    researcher.tavily_extract = FakeTavilyTool(urls)
+
+    personality_data = await researcher.research_person("Test Person")
+
+    assert personality_data.sources
+    assert researcher.tavily_search.max_in_flight == 2  # Primary and fallback searches overlap
+    assert researcher.tavily_extract.max_in_flight == len(urls)
+
+
+async def main() -> int:
+    """Run the research test, reporting configuration problems and other failures in one place.
+
+    Returns the process exit status: 0 on success, 1 on failure.
+    """
+    # Without LIVE=1, OpenAI and Tavily are answered from fixtures, so no real keys are needed
+    if not LIVE:
+        use_fixture_keys()
+
+    try:
+        await test_personality_research()
     except ValueError as e:
-        print(f"❌ Configuration error: {e}")
-        print("💡 Make sure you have the required environment variables set:")
-        print("   - TAVILY_API_KEY")
-        print("   - OPENAI_API_KEY")
+        report.info(f"❌ Configuration error: {e}")
+        report.info("💡 Make sure you have the required environment variables set:")
+        report.info("   - TAVILY_API_KEY")
+        report.info("   - OPENAI_API_KEY")
+        return 1
     except Exception as e:
-        print(f"❌ Error occurred: {e}")
+        report.error("❌ Error occurred: %s\n%s", e, traceback.format_exc().rstrip())
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(test_personality_research()) 
\ No newline at end of file
+    sys.exit(event_loops.run(main()))